@@ -0,0 +1,185 @@
+###########################################################
+# Filename: analyze.py
+# Last Modified: 10/18/2026
+#
+# difficulty analytics. Generates many boards per size and
+# difficulty with the game's rules and reports how hard
+# they are as JSON, e.g.
+#   python src/analyze.py --boards 100000
+#   python src/analyze.py --boards 1000000 --size 24x24 --difficulty HARD
+#
+# Boards are generated and measured a batch at a time as
+# one stacked array, so nothing loops per board or per tile
+#
+
+import argparse, json, time
+import numpy
+import config, engine, simulate
+
+# Tiles generated and measured at once
+BATCH_TILES = 1 << 22
+
+METRICS = ("3bv", "openings", "opening_size", "isolated_numbers", "first_click")
+
+def placeBatch(n, w, h, mineCount, start, rng):
+    """Lay out n boards the way Engine.fill does: exactly mineCount mines,
+    none in the 3x3 region around each board's first click.
+
+    Returns the (n, w, h) mine bitmaps and the (n, 2) first clicks.
+    """
+    if start == "center":
+        starts = numpy.tile((w // 2, h // 2), (n, 1))
+    else:
+        starts = numpy.stack((rng.integers(w, size=n), rng.integers(h, size=n)), axis=1)
+
+    # The mineCount smallest random keys of each board are its mines, which
+    # is a uniform pick; the start region's keys are out of reach
+    keys = rng.random((n, w * h), dtype=numpy.float32)
+    boards = numpy.arange(n)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            x = starts[:, 0] + dx
+            y = starts[:, 1] + dy
+            inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+            keys[boards[inside], x[inside] * h + y[inside]] = 2
+
+    mines = numpy.zeros((n, w * h), dtype=numpy.bool_)
+    if mineCount > 0:
+        picked = numpy.argpartition(keys, mineCount - 1, axis=1)[:, :mineCount]
+        mines[boards[:, None], picked] = True
+
+    return mines.reshape(n, w, h), starts
+
+def measureBatch(mines, starts):
+    """Per-board metrics of a stack of boards, plus the size of every
+    opening in it.
+
+    3BV is the least number of clicks that clears a board: one per
+    opening, plus one per number that borders no opening.
+    """
+    n, w, h = mines.shape
+    blank = (engine.countNeighbors(mines) == 0) & ~mines
+    parent = engine.findOpenings(blank)
+    flat = blank.ravel()
+
+    roots = flat & (parent == numpy.arange(n * w * h))
+    openings = roots.reshape(n, -1).sum(axis=1)
+    openingSize = numpy.bincount(parent[flat], minlength=n * w * h)[roots]
+
+    isolated = (~mines & (engine.countNeighbors(blank) == 0) & ~blank).reshape(n, -1).sum(axis=1)
+
+    # The first click is always a blank, and reveals its opening plus the
+    # numbers around it
+    startRoots = parent[numpy.arange(n) * (w * h) + starts[:, 0] * h + starts[:, 1]]
+    opened = blank & (parent.reshape(n, w, h) == startRoots[:, None, None])
+    firstClick = ((engine.countNeighbors(opened) > 0) | opened).reshape(n, -1).sum(axis=1)
+
+    return {
+        "3bv": openings + isolated,
+        "openings": openings,
+        "opening_size": openingSize,
+        "isolated_numbers": isolated,
+        "first_click": firstClick,
+    }
+
+def summarize(histogram):
+    """Distribution stats from a histogram of non-negative integers."""
+    count = int(histogram.sum())
+    if not count:
+        return {"count": 0}
+
+    values = numpy.arange(len(histogram))
+    mean = float((values * histogram).sum()) / count
+    cumulative = numpy.cumsum(histogram)
+
+    def percentile(p):
+        return int(numpy.searchsorted(cumulative, p / 100 * count))
+
+    return {
+        "count": count,
+        "mean": round(mean, 3),
+        "std": round(float(numpy.sqrt((((values - mean) ** 2) * histogram).sum() / count)), 3),
+        "min": int(numpy.flatnonzero(histogram)[0]),
+        "p5": percentile(5),
+        "p25": percentile(25),
+        "p50": percentile(50),
+        "p75": percentile(75),
+        "p95": percentile(95),
+        "max": int(numpy.flatnonzero(histogram)[-1]),
+    }
+
+def analyze(boards, w, h, modifier, start, rng):
+    """Generate and measure boards of one size and difficulty."""
+    mineCount = int(w * h * modifier)
+    batch = max(1, BATCH_TILES // (w * h))
+
+    # Every metric is bounded by the tile count, so fixed size histograms
+    # hold any number of boards
+    histograms = dict((name, numpy.zeros(w * h + 1, dtype=numpy.int64)) for name in METRICS)
+
+    t = time.perf_counter()
+    done = 0
+    while done < boards:
+        n = min(batch, boards - done)
+        metrics = measureBatch(*placeBatch(n, w, h, mineCount, start, rng))
+        for name, values in metrics.items():
+            histograms[name] += numpy.bincount(values, minlength=w * h + 1)
+        done = done + n
+    elapsed = time.perf_counter() - t
+
+    return {
+        "size": [w, h],
+        "modifier": modifier,
+        "mines": mineCount,
+        "boards": boards,
+        "seconds": round(elapsed, 3),
+        "boards_per_second": round(boards / elapsed, 1) if elapsed else None,
+        "metrics": dict((name, summarize(histogram)) for name, histogram in histograms.items()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how hard generated Minesweepyr boards are")
+    parser.add_argument("--boards", type=int, default=10000, help="boards per size and difficulty")
+    parser.add_argument("--size", action="append", help="board size in tiles, WxH, instead of the boardSizes in settings.json; may repeat")
+    parser.add_argument("--difficulty", action="append", help="difficulty name from settings.json or a mine density, instead of all of them; may repeat")
+    parser.add_argument("--start", choices=("random", "center"), default="random", help="where the first click lands")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    settings = config.loadSettings()
+
+    if args.size:
+        sizes = [tuple(int(n) for n in size.lower().split("x")) for size in args.size]
+    else:
+        sizes = config.getBoardSizes(settings)
+
+    if args.difficulty:
+        difficulties = [(name, config.loadDifficulty(name, settings)) for name in args.difficulty]
+    else:
+        difficulties = config.getDifficulties(settings)
+
+    rng = numpy.random.default_rng(args.seed)
+    results = []
+    for w, h in sizes:
+        for name, modifier in difficulties:
+            result = analyze(args.boards, w, h, modifier, args.start, rng)
+            result["difficulty"] = name
+            results.append(result)
+
+    report = {
+        "commit": simulate.getCommit(),
+        "seed": args.seed,
+        "start": args.start,
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as outFile:
+            outFile.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
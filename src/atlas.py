@@ -0,0 +1,150 @@
+###########################################################
+# Filename: atlas.py
+# Last Modified: 10/18/2026
+#
+# pre-rendered tile images shared by every tile on the
+# board, one set per tile size. Images are 8-bit and hold
+# palette indices rather than colors, so a theme is just a
+# palette plus a tile font and switching to one only swaps
+# palettes
+#
+
+import pygame
+import numpy
+import engine
+
+pygame.font.init()
+
+MINE = engine.MINE
+COVERED = engine.COVERED
+FLAGGED = engine.FLAGGED
+
+LOOK_COUNT = 12
+
+BORDER_SCALE = .95
+
+# Palette layout. Each tile style has a border entry followed by a ramp
+# from its fill color (0) to its text color (RAMP_SIZE - 1) that the
+# antialiased glyphs are quantized onto
+BOARD = 0
+RAMP_SIZE = 16
+TILE_STYLE = 16
+COVER_STYLE = TILE_STYLE + RAMP_SIZE + 1
+MINE_STYLE = COVER_STYLE + RAMP_SIZE + 1
+
+atlases = {}
+palettes = {}
+
+def getAtlas(theme, size):
+    """The atlas for size, switched to theme."""
+    if size not in atlases:
+        atlases[size] = TileAtlas(size)
+
+    atlases[size].setTheme(theme)
+    return atlases[size]
+
+def getPalette(theme):
+    if theme not in palettes:
+        palette = [(0, 0, 0)] * 256
+        palette[BOARD] = theme.boardColor
+
+        for style, color in ((TILE_STYLE, theme.tileColor), (COVER_STYLE, theme.tileCoverColor), (MINE_STYLE, theme.mineColor)):
+            text = (255-color[0],255-color[1],255-color[2])
+            palette[style] = (abs(color[0]-32),abs(color[1]-32),abs(color[2]-32))
+            for q in range(RAMP_SIZE):
+                palette[style + 1 + q] = tuple(int(round(c + (t - c) * q / (RAMP_SIZE - 1))) for c, t in zip(color, text))
+
+        palettes[theme] = palette
+
+    return palettes[theme]
+
+def getLook(value, uncovered, flagged):
+    if uncovered:
+        return value
+    elif flagged:
+        return FLAGGED
+    else:
+        return COVERED
+
+class TileAtlas():
+    def __init__(self, size):
+        self.size = size
+        self.fontSpec = None
+        self.palette = None
+
+        self.surfaces = [pygame.Surface((size, size), depth=8) for look in range(LOOK_COUNT)]
+        # The images again, indexed [look, y, x] to match surface memory
+        self.rows = numpy.zeros((LOOK_COUNT, size, size), dtype=numpy.uint8)
+
+    def setTheme(self, theme):
+        """Switch to theme's palette, re-rendering the images in place only
+        if its tile font differs. Returns whether the images changed."""
+        palette = getPalette(theme)
+        if palette is not self.palette:
+            self.palette = palette
+            for surface in self.surfaces:
+                surface.set_palette(palette)
+
+        if theme.tileFontSpec == self.fontSpec:
+            return False
+
+        self.fontSpec = theme.tileFontSpec
+        self.font = theme.tileFont
+        for look, surface in enumerate(self.surfaces):
+            image = self.render(look)
+            pygame.surfarray.blit_array(surface, image)
+            self.rows[look] = image.T
+        return True
+
+    def render(self, look):
+        """The (size, size) palette indices of look."""
+        if look == 0:
+            return numpy.full((self.size, self.size), TILE_STYLE + 1, dtype=numpy.uint8)
+        elif look == MINE:
+            return self.draw("X", MINE_STYLE)
+        elif look == FLAGGED:
+            return self.draw("F", COVER_STYLE)
+        elif look == COVERED:
+            return self.draw("", COVER_STYLE)
+        else:
+            return self.draw(look, TILE_STYLE)
+
+    def draw(self, value, style):
+        image = numpy.full((self.size, self.size), style, dtype=numpy.uint8)
+
+        inner = int(self.size * BORDER_SCALE)
+        offset = int((self.size / 2) - ((self.size * BORDER_SCALE) / 2))
+        image[offset:offset + inner, offset:offset + inner] = style + 1
+
+        number = self.font.render(str(value), True, (255, 255, 255))
+        if number.get_width() and number.get_height():
+            x = int((self.size / 2) - (number.get_width() / 2))
+            y = int((self.size / 2) - (number.get_height() / 2))
+
+            # Clip the glyph to the tile
+            alpha = pygame.surfarray.array_alpha(number).astype(numpy.int32)
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + alpha.shape[0], self.size), min(y + alpha.shape[1], self.size)
+            ramp = alpha[x0 - x:x1 - x, y0 - y:y1 - y] * (RAMP_SIZE - 1) // 255
+
+            area = image[x0:x1, y0:y1]
+            area[ramp > 0] = style + 1 + ramp[ramp > 0]
+
+        return image
+
+    def compose(self, looks, pixels):
+        """Write a whole board showing the (w, h) looks into pixels, an
+        (x, y) view like surfarray.pixels2d gives, in one vectorized pass.
+
+        The tiles are gathered row by row in the order surfaces lay out
+        their memory, which keeps the copy sequential.
+        """
+        w, h = looks.shape
+        rows = pixels[:w * self.size, :h * self.size].T.reshape(h, self.size, w, self.size)
+        rows[...] = self.rows[looks.T].transpose(0, 2, 1, 3)
+
+    def get(self, look):
+        return self.surfaces[look]
+
+    def getPalette(self):
+        return self.palette
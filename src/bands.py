@@ -0,0 +1,262 @@
+###########################################################
+# Filename: bands.py
+# Last Modified: 10/18/2026
+#
+# multi-core generation of one giant board. The board is
+# cut into bands of whole rows that worker processes lay
+# out, count and label in shared memory, reading one halo
+# row from each neighboring band where a step needs it
+#
+# Bands depend only on the board's shape and every band
+# draws from its own seed, so a seed gives the same board
+# whatever the number of workers
+#
+
+import concurrent.futures, contextlib, os
+from multiprocessing import shared_memory
+import numpy
+import engine
+
+# Tiles per band, rounded to whole rows
+BAND_TILES = 1 << 21
+
+def getBands(w, h):
+    """(x0, x1) row ranges of the bands of a (w, h) board."""
+    rows = max(1, BAND_TILES // h)
+    return [(x0, min(x0 + rows, w)) for x0 in range(0, w, rows)]
+
+def getStartRegion(band, h, startPos):
+    """The band's rows of the 3x3 start region, as a local index."""
+    x0, x1 = band
+    region = engine.safeRegion(startPos)
+    return (slice(max(region[0].start, x0) - x0, max(min(region[0].stop, x1), x0) - x0), region[1])
+
+class SharedArrays():
+    """Named arrays in shared memory. The parent creates them and every
+    worker attaches to them by name through attach."""
+    def __init__(self):
+        self.blocks = {}
+        self.specs = {}
+        self.arrays = {}
+
+    def create(self, name, shape, dtype):
+        dtype = numpy.dtype(dtype)
+        block = shared_memory.SharedMemory(create=True, size=max(int(numpy.prod(shape)) * dtype.itemsize, 1))
+        self.blocks[name] = block
+        self.specs[name] = (block.name, shape, dtype.str)
+        self.arrays[name] = numpy.ndarray(shape, dtype=dtype, buffer=block.buf)
+        return self.arrays[name]
+
+    def close(self):
+        self.arrays = {}
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+@contextlib.contextmanager
+def attach(specs):
+    blocks = []
+    arrays = {}
+    try:
+        for name, (blockName, shape, dtype) in specs.items():
+            blocks.append(shared_memory.SharedMemory(name=blockName))
+            arrays[name] = numpy.ndarray(shape, dtype=dtype, buffer=blocks[-1].buf)
+        yield arrays
+    finally:
+        arrays.clear()
+        for block in blocks:
+            block.close()
+
+def runStep(step, specs, *args):
+    # The step's views into the blocks are gone by the time they close
+    with attach(specs) as arrays:
+        return step(arrays, *args)
+
+def placeStep(arrays, band, startPos, quota, seed):
+    """Place the band's share of the mines uniformly outside the start
+    region."""
+    x0, x1 = band
+    h = arrays["mines"].shape[1]
+
+    allowed = numpy.ones((x1 - x0, h), dtype=numpy.bool_)
+    allowed[getStartRegion(band, h, startPos)] = False
+
+    mines = numpy.zeros((x1 - x0, h), dtype=numpy.bool_)
+    mines.flat[numpy.random.default_rng(seed).choice(numpy.flatnonzero(allowed), quota, replace=False)] = True
+    arrays["mines"][x0:x1] = mines
+
+def countStep(arrays, band):
+    x0, x1 = band
+    w = arrays["mines"].shape[0]
+    a0, a1 = max(x0 - 1, 0), min(x1 + 1, w)
+
+    counts = engine.countNeighbors(arrays["mines"][a0:a1])
+    arrays["counts"][x0:x1] = counts[x0 - a0:x1 - a0]
+
+def rootStep(arrays, band):
+    """Find the openings within the band; each blank names the smallest
+    cell of its opening inside the band, every other cell -1."""
+    x0, x1 = band
+    h = arrays["mines"].shape[1]
+
+    blank = (arrays["counts"][x0:x1] == 0) & ~arrays["mines"][x0:x1]
+    parent = engine.findOpenings(blank).astype(arrays["roots"].dtype) + x0 * h
+    arrays["roots"][x0:x1] = numpy.where(blank, parent.reshape(blank.shape), -1)
+
+def mergeStep(arrays, band, merged, mergedRoots):
+    """Point the band's blanks at the roots of the openings that span
+    bands. Returns how many roots the band holds."""
+    x0, x1 = band
+    h = arrays["mines"].shape[1]
+    roots = arrays["roots"][x0:x1].ravel()
+
+    if len(merged):
+        found = numpy.searchsorted(merged, roots).clip(max=len(merged) - 1)
+        hit = merged[found] == roots
+        roots[hit] = mergedRoots[found[hit]]
+
+    return int(numpy.count_nonzero(roots == numpy.arange(x0 * h, x1 * h)))
+
+def labelRootStep(arrays, band, firstLabel):
+    x0, x1 = band
+    h = arrays["mines"].shape[1]
+    roots = arrays["roots"][x0:x1].ravel()
+    labels = arrays["labels"][x0:x1].ravel()
+
+    isRoot = roots == numpy.arange(x0 * h, x1 * h)
+    labels[:] = 0
+    labels[isRoot] = firstLabel + numpy.arange(1, numpy.count_nonzero(isRoot) + 1)
+
+def labelStep(arrays, band):
+    # Roots may sit in an earlier band, which labelRootStep has finished
+    x0, x1 = band
+    h = arrays["mines"].shape[1]
+    roots = arrays["roots"][x0:x1].ravel()
+    blank = numpy.flatnonzero(roots >= 0)
+
+    arrays["labels"].ravel()[x0 * h + blank] = arrays["labels"].ravel()[roots[blank]]
+
+def getBorderKeys(arrays, band):
+    """label * tiles + cell for each cell of the band and opening it
+    touches, sorted, without repeats."""
+    x0, x1 = band
+    w, h = arrays["mines"].shape
+    a0, a1 = max(x0 - 1, 0), min(x1 + 1, w)
+
+    padded = numpy.zeros((x1 - x0 + 2, h + 2), dtype=numpy.int32)
+    padded[a0 - x0 + 1:a1 - x0 + 1, 1:-1] = arrays["labels"][a0:a1]
+    labels, cells = engine.touchingPairs(padded)
+
+    return engine.sortUnique(labels.astype(numpy.int64) * (w * h) + (x0 * h + cells))
+
+def countBorderStep(arrays, band):
+    """The labels of the openings the band touches, with how many of the
+    band's cells each one holds."""
+    w, h = arrays["mines"].shape
+    return numpy.unique(getBorderKeys(arrays, band) // (w * h), return_counts=True)
+
+def writeBorderStep(arrays, band, starts, counts):
+    """Write the band's cells of every opening at starts[i] on, counts[i]
+    of them, into the shared region cells."""
+    w, h = arrays["mines"].shape
+    keys = getBorderKeys(arrays, band)
+
+    first = numpy.zeros(len(counts), dtype=numpy.int64)
+    numpy.cumsum(counts[:-1], out=first[1:])
+    arrays["cells"][numpy.repeat(starts - first, counts) + numpy.arange(len(keys))] = keys % (w * h)
+
+def mergeBands(roots, bands):
+    """Join the openings that cross from one band into the next.
+
+    Returns the sorted roots that change and the roots they change to.
+    """
+    h = roots.shape[1]
+    a = [numpy.empty(0, dtype=roots.dtype)]
+    b = [numpy.empty(0, dtype=roots.dtype)]
+    for x0, x1 in bands[1:]:
+        above = roots[x0 - 1]
+        below = roots[x0]
+        for dy in (-1, 0, 1):
+            src = above[max(-dy, 0):h - max(dy, 0)]
+            dst = below[max(dy, 0):h + min(dy, 0)]
+            both = (src >= 0) & (dst >= 0)
+            a.append(src[both])
+            b.append(dst[both])
+
+    a = numpy.concatenate(a)
+    b = numpy.concatenate(b)
+    if not len(a):
+        return a, b
+
+    nodes = numpy.unique(numpy.concatenate((a, b)))
+    parent = engine.connect(numpy.arange(len(nodes)), numpy.searchsorted(nodes, a), numpy.searchsorted(nodes, b))
+    moved = parent != numpy.arange(len(nodes))
+    return nodes[moved], nodes[parent[moved]]
+
+def generate(w, h, mineCount, startPos, seed=None, workers=None):
+    """Lay out a (w, h) board with mineCount mines outside the 3x3 region
+    around startPos, as Engine.fill does, on workers processes.
+
+    Returns (mines, counts, regions) ready for Engine.load.
+    """
+    bands = getBands(w, h)
+    seeds = numpy.random.SeedSequence(seed).spawn(len(bands) + 1)
+
+    # How many mines each band gets is drawn up front, so the split, and
+    # with it the board, doesn't depend on how the bands are scheduled
+    allowed = [(x1 - x0) * h - numpy.ones((x1 - x0, h), dtype=numpy.bool_)[getStartRegion((x0, x1), h, startPos)].size for x0, x1 in bands]
+    quotas = numpy.random.default_rng(seeds[0]).multivariate_hypergeometric(allowed, min(mineCount, sum(allowed)))
+
+    shared = SharedArrays()
+    itype = engine.indexType(w * h)
+    mines = shared.create("mines", (w, h), numpy.bool_)
+    counts = shared.create("counts", (w, h), numpy.uint8)
+    roots = shared.create("roots", (w, h), itype)
+    labels = shared.create("labels", (w, h), numpy.int32)
+
+    executor = concurrent.futures.ProcessPoolExecutor(workers or os.cpu_count() or 1)
+    def run(step, *args):
+        return list(executor.map(runStep, [step] * len(bands), [shared.specs] * len(bands), bands, *args))
+
+    try:
+        run(placeStep, [startPos] * len(bands), quotas.tolist(), seeds[1:])
+        run(countStep)
+        run(rootStep)
+
+        merged, mergedRoots = mergeBands(roots, bands)
+        rootCounts = run(mergeStep, [merged] * len(bands), [mergedRoots] * len(bands))
+        firstLabels = numpy.concatenate(([0], numpy.cumsum(rootCounts)[:-1])).tolist()
+        run(labelRootStep, firstLabels)
+        run(labelStep)
+
+        # Region l's cells come band by band, so the CSR layout is the
+        # same as labelOpenings builds in one piece
+        regionCount = sum(rootCounts)
+        touching = run(countBorderStep)
+        sizes = numpy.zeros(regionCount + 1, dtype=numpy.int64)
+        for bandLabels, bandCounts in touching:
+            sizes[bandLabels] += bandCounts
+
+        offsets = numpy.cumsum(sizes).astype(numpy.intp)
+        cells = shared.create("cells", (int(offsets[-1]),), itype)
+        filled = offsets[:-1].copy()
+        starts = []
+        for bandLabels, bandCounts in touching:
+            starts.append(filled[bandLabels - 1].copy())
+            filled[bandLabels - 1] += bandCounts
+        run(writeBorderStep, starts, [bandCounts for bandLabels, bandCounts in touching])
+
+        return mines.copy(), counts.copy(), (labels.copy(), offsets, cells.copy())
+    finally:
+        executor.shutdown()
+        del mines, counts, roots, labels
+        if "cells" in shared.arrays:
+            del cells
+        shared.close()
+
+def fill(e, startPos, mineCount, seed=None, workers=None):
+    """Engine.fill on every core. Boards come out different from
+    Engine.fill's for the same seed, so e.seed is left unset and the
+    board is recorded as a bitmap."""
+    e.load(*generate(e.w, e.h, mineCount, startPos, seed, workers))
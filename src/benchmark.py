@@ -0,0 +1,268 @@
+###########################################################
+# Filename: benchmark.py
+# Last Modified: 10/18/2026
+#
+# micro benchmarks for the engine, run from the repository
+# root, e.g. `python src/benchmark.py generate`
+#
+
+import argparse, json, os, random, subprocess, sys, time
+import numpy
+import config, engine
+
+EXTRA_SIZES = [(64, 64), (256, 256)]
+
+# Board generated by the bands benchmark, in tiles
+GIANT_SIZE = (5000, 5000)
+
+def boardSizes(settings):
+    sizes = config.getBoardSizes(settings)
+    return sizes + [s for s in EXTRA_SIZES if s not in sizes]
+
+def measure(fn, repeat):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    times.sort()
+    return times[len(times) // 2]
+
+def report(rows):
+    for row in rows:
+        print("  ".join("%s=%s" % (k, ("%.6f" % v) if isinstance(v, float) else v) for k, v in row.items()))
+
+# The original Board.fillBoard placement: sweep a random probability map,
+# raising the threshold until every mine is placed, and count neighbors
+# with a nested loop per mine.
+def legacyFill(w, h, startPos, flaggable):
+    mineProb = 0.05
+    mineCount = 0
+
+    mineMatrix = [[random.random() for e in range(h)] for e in range(w)]
+    board = [[0 for e in range(h)] for e in range(w)]
+
+    for x in range(startPos[0] - 1 if startPos[0] - 1 > 0 else 0, startPos[0] + 2 if startPos[0] + 2 < w else w):
+        for y in range(startPos[1] - 1 if startPos[1] - 1 > 0 else 0, startPos[1] + 2 if startPos[1] + 2 < h else h):
+            mineMatrix[x][y] = 2
+
+    while mineCount < flaggable:
+        for x in range(w):
+            for y in range(h):
+                if mineMatrix[x][y] < mineProb and mineCount < flaggable:
+                    mineCount = mineCount + 1
+                    mineMatrix[x][y] = 2
+                    board[x][y] = engine.MINE
+
+                    for x1 in range(x - 1 if x - 1 > 0 else 0, x + 2 if x + 2 < w else w):
+                        for y1 in range(y - 1 if y - 1 > 0 else 0, y + 2 if y + 2 < h else h):
+                            if board[x1][y1] < 8:
+                                board[x1][y1] = board[x1][y1] + 1
+
+                if mineCount >= flaggable:
+                    break
+            if mineCount >= flaggable:
+                break
+        if mineCount >= flaggable:
+            break
+
+        mineProb = mineProb + 0.05
+
+    return board
+
+# The original neighbor lookup: a clamped 3x3 range loop per call
+def legacyNeighbors(w, h, i):
+    x, y = divmod(i, h)
+    return [x1 * h + y1
+        for x1 in range(x - 1 if x - 1 > 0 else 0, x + 2 if x + 2 < w else w)
+        for y1 in range(y - 1 if y - 1 > 0 else 0, y + 2 if y + 2 < h else h)
+        if x1 != x or y1 != y]
+
+# legacyFill only places mines and counts neighbors, so it is compared
+# against just that part of Engine.fill; labeling the openings, which the
+# original left to each click, is timed on its own
+def benchGenerate(args, settings):
+    rows = []
+    for w, h in boardSizes(settings):
+        e = engine.Engine(w, h)
+        startPos = (w // 2, h // 2)
+
+        for name, modifier in config.getDifficulties(settings):
+            flaggable = int(w * h * modifier)
+            rng = numpy.random.default_rng()
+
+            def place():
+                mines = engine.placeMines((w, h), startPos, flaggable, rng, e.topology)
+                return mines, e.topology.countNeighbors(mines)
+
+            mines, counts = place()
+            legacy = measure(lambda: legacyFill(w, h, startPos, flaggable), args.repeat)
+            placing = measure(place, args.repeat)
+            labeling = measure(lambda: engine.labelOpenings((counts == 0) & ~mines, e.topology), args.repeat)
+            fill = measure(lambda: e.fill(startPos, flaggable), args.repeat)
+
+            rows.append({"size": "%dx%d" % (w, h), "difficulty": name,
+                "legacy": legacy, "place": placing, "label": labeling, "fill": fill,
+                "speedup": "%.1fx" % (legacy / placing)})
+
+    return rows
+
+# Neighbor lookups for every tile, as chording does them, through the
+# range loop and the table, then generation and solved games per topology
+def benchNeighbors(args, settings):
+    rows = []
+    for w, h in boardSizes(settings):
+        topology = engine.getTopology("grid", w, h)
+        topology.getTable()
+
+        legacy = measure(lambda: [legacyNeighbors(w, h, i) for i in range(w * h)], args.repeat)
+        table = measure(lambda: [topology.getNeighbors(i) for i in range(w * h)], args.repeat)
+        row = {"size": "%dx%d" % (w, h), "legacy": legacy, "table": table, "speedup": "%.1fx" % (legacy / table)}
+
+        for name in sorted(engine.TOPOLOGIES.keys()):
+            e = engine.Engine(w, h, 0, topology=name)
+            row[name + "_fill"] = measure(lambda: e.fill((w // 2, h // 2), w * h // 5), args.repeat)
+        rows.append(row)
+
+    return rows
+
+# One giant board generated whole by Engine.fill, then in bands on 1 to
+# N worker processes, which must all lay out the same board
+def benchBands(args, settings):
+    import bands
+
+    w, h = (int(n) for n in args.size.lower().split("x")) if args.size else GIANT_SIZE
+    mineCount = int(w * h * config.getDifficulties(settings)[0][1])
+    startPos = (w // 2, h // 2)
+
+    e = engine.Engine(w, h)
+    rows = [{"size": "%dx%d" % (w, h), "mode": "engine", "workers": 1, "seconds": measure(lambda: e.fill(startPos, mineCount, 1), args.repeat)}]
+    del e
+
+    cores = os.cpu_count() or 1
+    counts = sorted(set([2 ** n for n in range(cores.bit_length()) if 2 ** n <= cores] + [cores]))
+    reference = None
+    for workers in counts:
+        seconds = measure(lambda: bands.generate(w, h, mineCount, startPos, 1, workers), args.repeat)
+        rows.append({"size": "%dx%d" % (w, h), "mode": "bands", "workers": workers, "seconds": seconds,
+            "speedup": "%.1fx" % (rows[1]["seconds"] / seconds if len(rows) > 1 else 1.0)})
+
+        mines = bands.generate(w, h, mineCount, startPos, 1, workers)[0]
+        if reference is None:
+            reference = mines
+        elif not numpy.array_equal(reference, mines):
+            raise SystemExit("%d workers laid out a different board" % workers)
+
+    return rows
+
+# Run in a fresh interpreter for every measurement so nothing is warm
+def startupChild(mode):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    phases = {}
+
+    t = time.perf_counter()
+    import pygame, game
+    phases["import"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    pygame.init()
+    screen = pygame.display.set_mode((640, 480))
+    phases["init"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    minesweeper = game.Game(config.TILE_SIZE, screen.get_size())
+    if mode == "eager":
+        # What startup used to cost: every theme's fonts looked up up front
+        for theme in [minesweeper.themeOption.getCurrentOption()] + list(minesweeper.themeOption.options):
+            theme.textFont, theme.tileFont
+    phases["game"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    minesweeper.draw(screen)
+    pygame.display.flip()
+    phases["first_frame"] = time.perf_counter() - t
+
+    # Without installed system fonts every lookup falls back to pygame's
+    # own font, and with one theme there is nothing left to defer, so
+    # eager and lazy only differ given several themes and real fonts
+    print(json.dumps({"phases": phases, "themes": len(minesweeper.themeOption.options),
+        "systemFonts": len(pygame.font.get_fonts())}))
+
+# Full board redraws, composed from scratch each time, for both renderers
+def benchRender(args, settings):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame, board, game
+
+    pygame.init()
+    screen = pygame.display.set_mode((640, 480))
+    minesweeper = game.Game(config.TILE_SIZE, screen.get_size())
+    difficulty = minesweeper.difficultyOption.getCurrentOption()
+
+    rows = []
+    for w, h in boardSizes(settings):
+        row = {"size": "%dx%d" % (w, h)}
+        for renderer in board.RENDERERS:
+            b = board.Board(config.TILE_SIZE, screen.get_size(), (w * config.TILE_SIZE, h * config.TILE_SIZE), difficulty, minesweeper.theme, seed=1, renderer=renderer)
+            b.fillBoard((w // 2, h // 2))
+            b.uncover(w // 2, h // 2)
+
+            def redraw():
+                b.recompose = True
+                b.drawAll(screen)
+
+            row[renderer] = measure(redraw, args.repeat)
+        row["speedup"] = "%.1fx" % (row["sprite"] / row["array"])
+        rows.append(row)
+
+    return rows
+
+def benchStartup(args, settings):
+    rows = []
+    for mode in ("eager", "lazy"):
+        runs = []
+        for i in range(args.repeat):
+            result = subprocess.run([sys.executable, os.path.abspath(__file__), "startup", "--child", mode], capture_output=True, text=True, check=True)
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        row = {"mode": mode, "themes": runs[0]["themes"], "systemFonts": runs[0]["systemFonts"]}
+        runs = [run["phases"] for run in runs]
+        for phase in runs[0]:
+            times = sorted(run[phase] for run in runs)
+            row[phase] = times[len(times) // 2]
+        totals = sorted(sum(run.values()) for run in runs)
+        row["total"] = totals[len(totals) // 2]
+        rows.append(row)
+
+    return rows
+
+BENCHMARKS = {
+    "bands": benchBands,
+    "generate": benchGenerate,
+    "neighbors": benchNeighbors,
+    "render": benchRender,
+    "startup": benchStartup,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Minesweepyr benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS.keys()))
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, the median is reported")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--size", help="board size in tiles for bands, WxH")
+    parser.add_argument("--child", choices=("eager", "lazy"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        startupChild(args.child)
+        return
+
+    rows = BENCHMARKS[args.benchmark](args, config.loadSettings())
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        report(rows)
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,48 @@
 ###########################################################
 # Filename: board.py
 # Author: Shaun Rasmusen <shaunrasmusen@gmail.com>
-# Last Modified: 12/31/2020
+# Last Modified: 10/18/2026
 #
 # Everything drawn to the screen that's related to the
-# game board and game actions
+# game board. Game rules and state live in engine.py
 #
 
+import concurrent.futures, time
 import pygame
-import colors, tiles
-import random
+import atlas, colors, engine, profiler, tiles
 
-MIN_MINE_PROBABILITY = 0.05
-INVALID_PROBABILITY = 2
+# Past this share of dirty tiles one full board blit beats per-tile updates
+FULL_REDRAW_RATIO = 0.25
 
-FONT = "Courier New"
+# How the board is drawn: one sprite per tile, or composed straight from the
+# engine's arrays through a surfarray view
+RENDERERS = ("sprite", "array")
+
+# Posted when a board generated in the background is ready, to wake the loop
+BOARD_READY = pygame.event.custom_type()
+
+# One worker, so a pregenerated layout is always done before the fill
+# that wants it
+worker = concurrent.futures.ThreadPoolExecutor(1)
 
 class Board():
-    def __init__(self, tileSize, screenSize, tileBoardSize, difficulty, theme):
-        self.playable = False
-        self.won = False
+    def __init__(self, tileSize, screenSize, tileBoardSize, difficulty, theme, pool=None, seed=None, recorder=None, profiler=None, renderer="sprite", feed=None):
+        self.drawnPlayable = False
+        self.renderer = renderer
+        self.pool = pool
+        self.seed = seed
+        self.generating = None
+        self.pendingFill = None
+        self.nextBoard = None
+        self.recorder = recorder
+        self.profiler = profiler
+        self.feed = feed
 
         self.tileGroup = pygame.sprite.Group()
         self.mineGroup = pygame.sprite.Group()
 
         self.tileMatrix = []
 
-        self.flaggable = 0
         self.setTileSize(tileSize)
         self.tileBoardSize = tileBoardSize
         self.screenSize = screenSize
@@ -38,14 +54,70 @@ class Board():
         self.updateTileBoard()
         
     def draw(self, screen):
-        self.tileBoard.fill(self.theme.boardColor)
-        self.tileGroup.draw(self.tileBoard)
-        self.mineGroup.draw(self.tileBoard)
-        screen.blit(self.tileBoard, self.getTileBoardRelativeCenter())
-
-        if not self.playable:
+        """Draw whatever changed since the last call.
+
+        Returns the list of screen rects that were touched.
+        """
+        self.pollFill()
+
+        if self.isPlayable() != self.drawnPlayable:
+            self.invalidate()
+
+        if self.redrawAll or len(self.dirtyTiles) > self.engine.totalTiles * FULL_REDRAW_RATIO:
+            if self.profiler:
+                self.profiler.count("redrawn", self.engine.totalTiles)
+            return [self.drawAll(screen)]
+        if self.profiler and self.dirtyTiles:
+            self.profiler.count("redrawn", len(self.dirtyTiles))
+
+        origin = self.getTileBoardOrigin()
+        rects = []
+        if self.renderer == "array":
+            tileAtlas = atlas.getAtlas(self.theme, self.tileSize)
+            looks = self.engine.getLooks(self.dirtyTiles).tolist()
+            for i, look in zip(self.dirtyTiles, looks):
+                x, y = self.engine.getPos(i)
+                area = self.tileBoard.blit(tileAtlas.get(look), (x * self.tileSize, y * self.tileSize))
+                rects.append(screen.blit(self.tileBoard, area.move(origin), area))
+        else:
+            for i in self.dirtyTiles:
+                x, y = self.engine.getPos(i)
+                tile = self.tileMatrix[x][y]
+                area = self.tileBoard.blit(tile.image, tile.rect)
+                rects.append(screen.blit(self.tileBoard, area.move(origin), area))
+
+        self.dirtyTiles = []
+        return rects
+
+    def drawAll(self, screen):
+        # The tile board only needs composing again when its tiles were
+        # replaced or re-rendered; a new palette alone just needs the blit
+        if self.recompose or self.dirtyTiles:
+            self.compose()
+            self.recompose = False
+        rect = screen.blit(self.tileBoard, self.getTileBoardOrigin())
+
+        if not self.isPlayable():
             self.tileBoardOverlay.fill(self.theme.boardColor)
-            screen.blit(self.tileBoardOverlay, self.getTileBoardRelativeCenter())
+            screen.blit(self.tileBoardOverlay, self.getTileBoardOrigin())
+
+        self.redrawAll = False
+        self.drawnPlayable = self.isPlayable()
+        self.dirtyTiles = []
+        return rect
+
+    def compose(self):
+        self.tileBoard.fill(atlas.BOARD)
+        if self.renderer == "sprite":
+            self.tileGroup.draw(self.tileBoard)
+            self.mineGroup.draw(self.tileBoard)
+        elif self.engine.filled and not self.generating:
+            pixels = pygame.surfarray.pixels2d(self.tileBoard)
+            atlas.getAtlas(self.theme, self.tileSize).compose(self.engine.getLookMatrix(), pixels)
+            del pixels
+
+    def invalidate(self):
+        self.redrawAll = True
 
     def processClick(self, event):
         pressed1, pressed2, pressed3 = pygame.mouse.get_pressed()
@@ -59,142 +131,229 @@ class Board():
             scaledX = int(x / self.getTileSize())
             scaledY = int(y / self.getTileSize())
 
-            if not self.playable:
-                self.fillBoard((scaledX, scaledY))
+            if self.isGenerating():
+                return
 
-            if pressed1:
-                if not self.getTile(scaledX, scaledY).isFlagged():
-                    self.uncover(scaledX, scaledY)
-            elif pressed3:
-                if not self.getTile(scaledX, scaledY).isUncovered():
-                    self.flipFlagged(scaledX, scaledY)
+            action = "uncover" if pressed1 else "flag" if pressed3 else None
+            if not self.isPlayable():
+                self.startFill((scaledX, scaledY), action)
+            else:
+                self.act(action, scaledX, scaledY)
 
-    def fillBoard(self, startPos):
-        self.resetGame()
+    def act(self, action, x, y):
+        if action == "uncover":
+            if not self.engine.isFlagged(x, y):
+                self.uncover(x, y)
+        elif action == "flag":
+            if not self.engine.isUncovered(x, y):
+                self.flipFlagged(x, y)
 
-        mineProb = MIN_MINE_PROBABILITY
-        random.seed()
+    def processScroll(self, event):
+        return
 
-        w, h = self.getScaledBounds()
-        self.totalTiles = w * h
-        self.flaggable = int(w * h * self.difficulty.getModifier())
-
-        self.tileMatrix = [[object for e in range(h)] for e in range(w)]
-        mineMatrix = [[random.random() for e in range(h)] for e in range(w)]
-        board = [[0 for e in range(h)] for e in range(w)]
-
-        # Ensures that first click always starts in a blank space
-        for x in range(startPos[0] - 1 if startPos[0] - 1 > 0 else 0, startPos[0] + 2 if startPos[0] + 2 < w else w):
-            for y in range(startPos[1] - 1 if startPos[1] - 1 > 0 else 0, startPos[1] + 2 if startPos[1] + 2 < h else h):
-                mineMatrix[x][y] = INVALID_PROBABILITY
-
-        # Iterate over the probability map and set mines accordingly.
-        # Start with a minimum probability threshold and while the total number
-        # has not been reached, increment the threshold until all mines are set.
-        while self.mineCount < self.flaggable:
-            for x in range(w):
-                for y in range(h):
-                    if mineMatrix[x][y] < mineProb and self.mineCount < self.flaggable:
-                        self.mineCount = self.mineCount + 1
-                        mineMatrix[x][y] = INVALID_PROBABILITY
-                        board[x][y] = tiles.MINE
-
-                        for x1 in range(x - 1 if x - 1 > 0 else 0, x + 2 if x + 2 < w else w):
-                            for y1 in range(y - 1 if y - 1 > 0 else 0, y + 2 if y + 2 < h else h):
-                                if board[x1][y1] < 8:
-                                    board[x1][y1] = board[x1][y1] + 1
-
-                    if self.mineCount >= self.flaggable:
-                        break
-                if self.mineCount >= self.flaggable:
-                    break
-            if self.mineCount >= self.flaggable:
-                break
-            
-            mineProb = mineProb + 0.05
-            
-        for x in range(w):
-            for y in range(h):
-                tile = object
-
-                if board[x][y] == tiles.MINE:
-                    tile = tiles.MineTile(pos=(x, y), theme=self.theme)
-                    self.mineGroup.add(tile)
-                else:
-                    tile = tiles.NumberTile(value=board[x][y], pos=(x, y), theme=self.theme)
-                    self.tileGroup.add(tile)
+    def fillBoard(self, startPos):
+        """Fill the board for a game starting at startPos, waiting for it."""
+        self.resetGame()
 
-                self.tileMatrix[x][y] = tile
+        start = time.perf_counter()
+        self.install(self.generate(self.engine, startPos, self.getMineCount(), self.takeNextBoard(), self.theme, self.tileSize), startPos, start)
 
-        self.playable = True
+    def startFill(self, startPos, action=None):
+        """Fill the board on the worker thread, then apply action at
+        startPos. The board stays blank and ignores clicks meanwhile."""
+        self.resetGame()
 
-    def updateSurrounding(self, x, y, w, h):
-        for x1 in range(x - 1 if x - 1 > 0 else 0, x + 2 if x + 2 < w else w):
-            for y1 in range(y - 1 if y - 1 > 0 else 0, y + 2 if y + 2 < h else h):
-                if self.tileMatrix[x1][y1].isUncovered() == False:
-                    self.uncoverTile(x1, y1)
+        self.pendingFill = (startPos, action, time.perf_counter())
+        self.generating = worker.submit(self.generateAndNotify, self.engine, startPos, self.getMineCount(), self.takeNextBoard(), self.theme, self.tileSize)
+
+    def pollFill(self):
+        """Install the board filled in the background once it is ready."""
+        if self.generating and self.generating.done():
+            self.finishFill()
+
+    def finishFill(self):
+        startPos, action, start = self.pendingFill
+        result = self.generating.result()
+        self.generating = None
+
+        self.install(result, startPos, start)
+        self.act(action, *startPos)
+
+    def generateAndNotify(self, *args):
+        result = self.generate(*args)
+        if pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(BOARD_READY))
+
+        return result
+
+    def generate(self, e, startPos, mineCount, nextBoard, theme, tileSize):
+        """Fill engine e and, for the sprite renderer, build the tile
+        sprites for a new game.
+
+        Runs on the worker thread while the board is blank, so it only
+        works from its arguments. The main thread leaves e alone until
+        install, and waits for this to finish before replacing e. e's
+        listeners run on the main thread, so they are only told about the
+        new game in install.
+        """
+        w, h = e.getBounds()
+        mines = self.pool.take(w, h, mineCount, startPos) if self.pool else None
+
+        if mines is not None:
+            e.load(mines, notify=False)
+        elif nextBoard:
+            layout, seed = nextBoard
+            e.fill(startPos, mineCount, seed, layout.result(), notify=False)
+        else:
+            e.fill(startPos, mineCount, notify=False)
+
+        # The array renderer draws from the engine alone
+        if self.renderer == "array":
+            return ([], pygame.sprite.Group(), pygame.sprite.Group())
+
+        tileMatrix = [[object for y in range(h)] for x in range(w)]
+        tileGroup = pygame.sprite.Group()
+        mineGroup = pygame.sprite.Group()
 
-                    if self.tileMatrix[x1][y1].getValue() == 0:
-                        self.updateSurrounding(x1, y1, w, h)
-    
-    def revealMines(self):
-        self.playable = False
-        w, h = self.getScaledBounds()
         for x in range(w):
             for y in range(h):
-                if self.tileMatrix[x][y].getValue() == 9:
-                    self.tileMatrix[x][y].setFlagged(False)
-                    self.tileMatrix[x][y].setUncovered(True)
+                tile = object
 
-    def uncoverTile(self, x, y):
-        if not self.tileMatrix[x][y].isUncovered():
-            self.countUncoveredTiles = self.countUncoveredTiles + 1
-            self.tileMatrix[x][y].setUncovered(True)
+                if e.isMine(x, y):
+                    tile = tiles.MineTile(pos=(x, y), theme=theme, size=tileSize)
+                    mineGroup.add(tile)
+                else:
+                    tile = tiles.NumberTile(value=e.getValue(x, y), pos=(x, y), theme=theme, size=tileSize)
+                    tileGroup.add(tile)
+
+                tileMatrix[x][y] = tile
+
+        return (tileMatrix, tileGroup, mineGroup)
+
+    def install(self, result, startPos, start):
+        self.engine.notify(None)
+        self.tileMatrix, self.tileGroup, self.mineGroup = result
+        if self.profiler:
+            self.profiler.time("fill", time.perf_counter() - start)
+        if self.recorder:
+            self.recorder.recordGame(self.engine, startPos)
+
+        self.recompose = True
+        self.invalidate()
+        self.pregenerate()
+
+    def pregenerate(self):
+        """Lay out the next board for this size and difficulty on the
+        worker thread, ahead of the click that will need it."""
+        key = self.getScaledBounds() + (self.getMineCount(),)
+        if self.pool or (self.nextBoard and self.nextBoard[0] == key):
+            return
+
+        seed = int(self.engine.rng.integers(2**63))
+        self.nextBoard = (key, worker.submit(engine.placeLayout, key[:2], key[2], seed), seed)
+
+    def takeNextBoard(self):
+        """The pregenerated (layout, seed) if it fits the board as it is
+        now, else None."""
+        if self.nextBoard and self.nextBoard[0] == self.getScaledBounds() + (self.getMineCount(),):
+            key, layout, seed = self.nextBoard
+            self.nextBoard = None
+            return (layout, seed)
+        return None
+
+    def updateTiles(self, changed):
+        self.dirtyTiles.extend(changed)
+        if self.renderer == "array":
+            return
+
+        for i in changed:
+            x, y = self.engine.getPos(i)
+            self.tileMatrix[x][y].setState(self.engine.isUncovered(x, y), self.engine.isFlagged(x, y))
 
     def uncover(self, x, y):
-        self.uncoverTile(x,y)
-        
-        if self.tileMatrix[x][y].getValue() == 0:
-            w, h = self.getScaledBounds()
-            self.updateSurrounding(x, y, w, h)
-
-        if self.tileMatrix[x][y].getValue() == 9:
-            self.revealMines()
-        elif self.countUncoveredTiles + self.mineCount == self.totalTiles:
-            self.win()
+        changed = self.engine.uncover(x, y)
+        self.updateTiles(changed)
+        if self.recorder:
+            self.recorder.recordAction("uncover", x, y, changed)
+        if self.profiler:
+            self.profiler.count("revealed", len(changed))
+        return changed
+
+    def apply(self, actions):
+        """Apply a batch of (action, x, y) moves, see Engine.apply, and
+        update the sprites once for the whole batch.
+
+        Returns the flat indices of the tiles that changed.
+        """
+        actions = list(actions)
+        changed = self.engine.apply(actions)
+        self.updateTiles(changed)
+        if self.recorder:
+            self.recorder.recordBatch(actions, changed)
+        return changed
+
+    def undo(self):
+        return self.rewind(self.engine.getMoveCount() - 1)
+
+    def redo(self):
+        return self.rewind(self.engine.getMoveCount() + 1)
+
+    def rewind(self, move):
+        """Undo or redo moves until move moves have been made, see
+        Engine.rewind. Moves outside the history are ignored.
+
+        Returns the flat indices of the tiles that changed.
+        """
+        if self.isGenerating() or move not in self.engine.history.getRange():
+            return engine.NO_CHANGE
+
+        changed = self.engine.rewind(move)
+        self.updateTiles(changed)
+        if self.recorder:
+            self.recorder.recordRewind(move, changed)
+        return changed
 
     def flipFlagged(self, x, y):
-        inc = 1 if self.tileMatrix[x][y].isFlagged() else -1
-        self.flaggable = self.flaggable + inc
-        self.tileMatrix[x][y].setFlagged(not self.tileMatrix[x][y].isFlagged())
-
-        if self.flaggable == 0:
-            allFlagged = True
-            for mine in self.mineGroup:
-                if not mine.isFlagged():
-                    allFlagged = False
-                    break
-            
-            if allFlagged:
-                self.win()
+        changed = self.engine.flag(x, y)
+        self.updateTiles(changed)
+        if self.recorder:
+            self.recorder.recordAction("flag", x, y, changed)
+        return changed
     
     def updateTileBoard(self):
-        self.resetGame()
-        self.tileBoard = pygame.Surface(self.tileBoardSize)
+        self.abandonFill()
+        self.tileBoard = pygame.Surface(self.tileBoardSize, depth=8)
+        self.tileBoard.set_palette(atlas.getAtlas(self.theme, self.tileSize).getPalette())
         self.tileBoardOverlay = pygame.Surface(self.tileBoardSize)
         self.tileBoardOverlay.set_alpha(64, pygame.RLEACCEL)
+        self.engine = engine.Engine(*self.getScaledBounds(), self.seed)
+        if self.feed:
+            self.feed.attach(self.engine)
+        self.resetGame()
 
-    def win(self):
-        self.playable = False
-        self.won = True
+    def abandonFill(self):
+        """Drop any board still generating, waiting for the worker if it
+        has started, so nothing it holds is replaced under it."""
+        if self.generating:
+            if not self.generating.cancel():
+                self.generating.result()
+            self.generating = None
+            self.pendingFill = None
 
     def resetGame(self):
-        self.won = False
-        self.playable = False
+        self.abandonFill()
+
         self.tileGroup.empty()
         self.mineGroup.empty()
-        self.mineCount = 0
-        self.countUncoveredTiles = 0
+        self.engine.reset()
+        self.dirtyTiles = []
+        self.recompose = True
+        self.invalidate()
+
+        if self.pool:
+            self.pool.request(*self.getScaledBounds(), self.getMineCount())
+        else:
+            self.pregenerate()
 
     def getTile(self, x, y):
         return self.tileMatrix[x][y]
@@ -205,29 +364,39 @@ class Board():
     def getTileBoardRelativeCenter(self):
         return ((self.screenSize[0] / 2) - (self.tileBoard.get_width() / 2), (self.screenSize[1] / 2) - (self.tileBoard.get_height() / 2))
 
+    def getTileBoardOrigin(self):
+        x, y = self.getTileBoardRelativeCenter()
+        return (int(x), int(y))
+
     def getTileSize(self):
         return self.tileSize
 
     def setTileSize(self, tileSize):
         self.tileSize = tileSize
-        self.monospaceFont = pygame.font.SysFont(FONT, int(self.tileSize * .9))
 
     def getScaledBounds(self):
-        w = int(self.tileBoard.get_width() / self.tileSize)
-        if self.tileBoard.get_width() % self.tileSize != 0: w = w - 1
-        h = int(self.tileBoard.get_height() / self.tileSize)
-        if self.tileBoard.get_height() % self.tileSize != 0: h = h - 1
+        return engine.tileBounds(self.tileBoard.get_size(), self.tileSize)
 
-        return (w,h)
+    def getMineCount(self):
+        w, h = self.getScaledBounds()
+        return int(w * h * self.difficulty.getModifier())
 
+    # While generating, the engine belongs to the worker thread; until
+    # install it stands for the blank board that resetGame left behind
     def getFlagsLeft(self):
-        return self.flaggable
+        return 0 if self.generating else self.engine.getFlagsLeft()
 
     def hasWon(self):
-        return self.won
+        return False if self.generating else self.engine.hasWon()
     
     def isPlayable(self):
-        return self.playable
+        return False if self.generating else self.engine.isPlayable()
+
+    def isGenerating(self):
+        return self.generating is not None
+
+    def getEngine(self):
+        return self.engine
 
     def getTileBoardSize(self):
         return self.tileBoardSize
@@ -244,8 +413,14 @@ class Board():
         self.resetGame()
 
     def setTheme(self, theme):
+        if self.generating:
+            self.finishFill()
+
+        # Tiles point at the shared atlas images, so they follow the new
+        # palette (and font) without being touched
+        if theme.tileFontSpec != self.theme.tileFontSpec:
+            self.recompose = True
+
         self.theme = theme
-        for tileRow in self.tileMatrix:
-            for tile in tileRow:
-                tile.setTheme(self.theme)
-                tile.redraw()
+        self.tileBoard.set_palette(atlas.getAtlas(theme, self.tileSize).getPalette())
+        self.invalidate()
@@ -0,0 +1,289 @@
+###########################################################
+# Filename: chunks.py
+# Last Modified: 10/18/2026
+#
+# Headless engine for boards too big to hold in memory.
+# The field is split into square chunks whose mines are
+# generated from the game seed on demand, so only chunks
+# that are looked at or revealed into ever exist
+#
+
+import numpy
+from collections import deque
+import engine
+
+CHUNK_SIZE = 32
+
+# Chunks a single reveal may flood into before the rest of the flood is
+# parked until those chunks are looked at. Counting chunks entered rather
+# than materialized keeps where a flood stops independent of what was
+# looked at, so a recording replays the same
+MAX_CHUNKS_PER_REVEAL = 64
+
+class Chunk():
+    def __init__(self, mines, counts):
+        self.mines = mines
+        self.counts = counts
+        self.revealed = numpy.zeros(mines.shape, dtype=numpy.bool_)
+        self.flagged = numpy.zeros(mines.shape, dtype=numpy.bool_)
+
+        self.regions, self.regionOffsets, self.regionCells = engine.labelOpenings((counts == 0) & ~mines)
+
+    def getLookMatrix(self):
+        """What each tile of the chunk shows, see Engine.getLooks."""
+        looks = self.counts.astype(numpy.uint8)
+        looks[self.mines] = engine.MINE
+        looks[~self.revealed] = engine.COVERED
+        looks[self.flagged] = engine.FLAGGED
+        return looks
+
+    def getRegion(self, x, y):
+        label = self.regions[x, y]
+        return self.regionCells[self.regionOffsets[label - 1]:self.regionOffsets[label]]
+
+class ChunkedEngine():
+    def __init__(self, w, h):
+        self.w = w
+        self.h = h
+
+        self.cw = -(-w // CHUNK_SIZE)
+        self.ch = -(-h // CHUNK_SIZE)
+
+        self.reset()
+
+    def reset(self):
+        self.mineLayouts = {}
+        self.chunks = {}
+        self.pending = {}
+
+        self.filled = False
+        self.won = False
+        self.lost = False
+
+        self.mineCount = 0
+        self.flagsLeft = 0
+        self.correctFlags = 0
+        self.countUncoveredTiles = 0
+        self.totalTiles = self.w * self.h
+
+    def fill(self, startPos, mineCount, seed=None):
+        self.reset()
+
+        self.seed = numpy.random.SeedSequence(seed).entropy
+        self.safeCells = set()
+        for x in range(max(startPos[0] - 1, 0), min(startPos[0] + 2, self.w)):
+            for y in range(max(startPos[1] - 1, 0), min(startPos[1] + 2, self.h)):
+                self.safeCells.add((x, y))
+
+        # Split the mines between chunks up front so the total is exact;
+        # where they sit inside a chunk is only decided once it is needed
+        widths = numpy.minimum(CHUNK_SIZE, self.w - numpy.arange(self.cw) * CHUNK_SIZE)
+        heights = numpy.minimum(CHUNK_SIZE, self.h - numpy.arange(self.ch) * CHUNK_SIZE)
+        allowed = numpy.outer(widths, heights).astype(numpy.int64)
+        for x, y in self.safeCells:
+            allowed[x // CHUNK_SIZE, y // CHUNK_SIZE] -= 1
+
+        self.mineCount = min(mineCount, int(allowed.sum()))
+        rng = numpy.random.default_rng([self.seed])
+        self.chunkMineCounts = rng.multivariate_hypergeometric(allowed.ravel(), self.mineCount, method="marginals").reshape(self.cw, self.ch)
+
+        self.flagsLeft = self.mineCount
+        self.filled = True
+
+    def getChunkShape(self, key):
+        return (min(CHUNK_SIZE, self.w - key[0] * CHUNK_SIZE), min(CHUNK_SIZE, self.h - key[1] * CHUNK_SIZE))
+
+    def getMines(self, key):
+        """Mine bitmap of a chunk, regenerated from the seed when first asked for."""
+        if key not in self.mineLayouts:
+            shape = self.getChunkShape(key)
+            allowed = numpy.ones(shape, dtype=numpy.bool_)
+            for x, y in self.safeCells:
+                if (x // CHUNK_SIZE, y // CHUNK_SIZE) == key:
+                    allowed[x % CHUNK_SIZE, y % CHUNK_SIZE] = False
+
+            rng = numpy.random.default_rng([self.seed, key[0], key[1]])
+            mines = numpy.zeros(shape, dtype=numpy.bool_)
+            mines.flat[rng.choice(numpy.flatnonzero(allowed), self.chunkMineCounts[key], replace=False)] = True
+            self.mineLayouts[key] = mines
+
+        return self.mineLayouts[key]
+
+    def hasChunk(self, key):
+        return key in self.chunks
+
+    def getChunk(self, key):
+        """The chunk at key, materializing it if needed."""
+        if key not in self.chunks:
+            self.materialize(key)
+
+        return self.chunks[key]
+
+    def activate(self, cx, cy):
+        """Materialize the chunk at (cx, cy) as it comes into view and
+        resume any reveal parked on it, which is a move of its own.
+
+        Returns the global flat indices of the tiles whose state changed.
+        """
+        key = (cx, cy)
+        self.getChunk(key)
+
+        if key in self.pending and self.isPlayable():
+            return self.reveal(self.pending.pop(key))
+
+        return engine.NO_CHANGE
+
+    def materialize(self, key):
+        cx, cy = key
+        w, h = self.getChunkShape(key)
+
+        # Mines of the chunk plus a one cell halo taken from its neighbors
+        padded = numpy.zeros((w + 2, h + 2), dtype=numpy.bool_)
+        for nx in range(cx - 1, cx + 2):
+            for ny in range(cy - 1, cy + 2):
+                if 0 <= nx < self.cw and 0 <= ny < self.ch:
+                    mines = self.getMines((nx, ny))
+                    x0 = (nx - cx) * CHUNK_SIZE + 1
+                    y0 = (ny - cy) * CHUNK_SIZE + 1
+                    sx = slice(max(x0, 0), min(x0 + mines.shape[0], w + 2))
+                    sy = slice(max(y0, 0), min(y0 + mines.shape[1], h + 2))
+                    padded[sx, sy] = mines[sx.start - x0:sx.stop - x0, sy.start - y0:sy.stop - y0]
+
+        chunk = Chunk(padded[1:-1, 1:-1].copy(), engine.countNeighbors(padded)[1:-1, 1:-1])
+        if self.lost:
+            chunk.revealed[chunk.mines] = True
+        self.chunks[key] = chunk
+
+    def uncover(self, x, y):
+        """Reveal the tile at (x, y), flooding across chunk borders.
+
+        Returns the global flat indices (x * h + y) of the tiles whose
+        state changed. Floods that run further than MAX_CHUNKS_PER_REVEAL
+        chunks continue when the chunks they stopped at are activated.
+        """
+        if not self.isPlayable():
+            return engine.NO_CHANGE
+
+        return self.reveal([(x, y)])
+
+    def reveal(self, seeds):
+        changed = []
+        entered = set()
+        queue = deque(seeds)
+
+        while queue:
+            x, y = queue.popleft()
+            key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+
+            if key not in entered:
+                if len(entered) >= MAX_CHUNKS_PER_REVEAL:
+                    self.pending.setdefault(key, []).append((x, y))
+                    continue
+                entered.add(key)
+
+            chunk = self.getChunk(key)
+            if key in self.pending:
+                queue.extend(self.pending.pop(key))
+
+            lx, ly = x - key[0] * CHUNK_SIZE, y - key[1] * CHUNK_SIZE
+            if chunk.revealed[lx, ly] or chunk.flagged[lx, ly]:
+                continue
+
+            if chunk.mines[lx, ly]:
+                changed.append(self.revealMines())
+                break
+
+            ch = chunk.mines.shape[1]
+            if chunk.regions[lx, ly]:
+                cells = chunk.getRegion(lx, ly)
+                cells = cells[~chunk.revealed.flat[cells] & ~chunk.flagged.flat[cells]]
+            else:
+                cells = numpy.array([lx * ch + ly])
+
+            chunk.revealed.flat[cells] = True
+            self.countUncoveredTiles = self.countUncoveredTiles + len(cells)
+
+            cellX, cellY = numpy.divmod(cells, ch)
+            changed.append((cellX + key[0] * CHUNK_SIZE) * self.h + (cellY + key[1] * CHUNK_SIZE))
+
+            # Blanks on the chunk edge keep the flood going into the neighbors
+            edge = (chunk.counts.flat[cells] == 0) & ((cellX == 0) | (cellY == 0) | (cellX == chunk.mines.shape[0] - 1) | (cellY == ch - 1))
+            for ex, ey in zip(cellX[edge], cellY[edge]):
+                gx, gy = int(ex) + key[0] * CHUNK_SIZE, int(ey) + key[1] * CHUNK_SIZE
+                for nx in range(max(gx - 1, 0), min(gx + 2, self.w)):
+                    for ny in range(max(gy - 1, 0), min(gy + 2, self.h)):
+                        if (nx // CHUNK_SIZE, ny // CHUNK_SIZE) != key:
+                            queue.append((nx, ny))
+
+        if not self.lost and self.countUncoveredTiles + self.mineCount == self.totalTiles:
+            self.won = True
+
+        return numpy.concatenate(changed) if changed else engine.NO_CHANGE
+
+    def revealMines(self):
+        changed = []
+        for key, chunk in self.chunks.items():
+            hidden = numpy.flatnonzero(chunk.mines & ~chunk.revealed)
+            cellX, cellY = numpy.divmod(hidden, chunk.mines.shape[1])
+            changed.append((cellX + key[0] * CHUNK_SIZE) * self.h + (cellY + key[1] * CHUNK_SIZE))
+
+            chunk.flagged[chunk.mines] = False
+            chunk.revealed[chunk.mines] = True
+
+        self.pending = {}
+        self.lost = True
+
+        return numpy.concatenate(changed)
+
+    def flag(self, x, y):
+        """Flip the flag on the tile at (x, y).
+
+        Returns the global flat indices of the tiles whose state changed.
+        """
+        if not self.isPlayable():
+            return engine.NO_CHANGE
+
+        chunk = self.getChunk((x // CHUNK_SIZE, y // CHUNK_SIZE))
+        lx, ly = x % CHUNK_SIZE, y % CHUNK_SIZE
+        if chunk.revealed[lx, ly]:
+            return engine.NO_CHANGE
+
+        inc = 1 if chunk.flagged[lx, ly] else -1
+        self.flagsLeft = self.flagsLeft + inc
+        if chunk.mines[lx, ly]:
+            self.correctFlags = self.correctFlags - inc
+        chunk.flagged[lx, ly] = not chunk.flagged[lx, ly]
+
+        if self.flagsLeft == 0 and self.correctFlags == self.mineCount:
+            self.won = True
+
+        return numpy.array([x * self.h + y])
+
+    def getPos(self, i):
+        return divmod(int(i), self.h)
+
+    def isFlagged(self, x, y):
+        key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+        return key in self.chunks and bool(self.chunks[key].flagged[x % CHUNK_SIZE, y % CHUNK_SIZE])
+
+    def isUncovered(self, x, y):
+        key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+        return key in self.chunks and bool(self.chunks[key].revealed[x % CHUNK_SIZE, y % CHUNK_SIZE])
+
+    def isPlayable(self):
+        return self.filled and not self.won and not self.lost
+
+    def hasWon(self):
+        return self.won
+
+    def hasLost(self):
+        return self.lost
+
+    def getFlagsLeft(self):
+        return self.flagsLeft
+
+    def getBounds(self):
+        return (self.w, self.h)
+
+    def getChunkBounds(self):
+        return (self.cw, self.ch)
@@ -0,0 +1,41 @@
+###########################################################
+# Filename: config.py
+# Last Modified: 10/18/2026
+#
+# settings.json loading shared by the game and the command
+# line tools. Kept free of pygame so the headless tools can
+# read the settings without opening a display
+#
+
+import json
+import engine
+
+SETTINGS_FILENAME = 'settings.json'
+
+# Tile size in pixels that the pixel boardSizes are laid out in
+TILE_SIZE = 16
+
+def loadSettings():
+    with open(SETTINGS_FILENAME, "r") as inFile:
+        return json.loads(inFile.read())
+
+def getBoardSizes(settings):
+    """The boardSizes in settings as (w, h) in tiles."""
+    return [engine.tileBounds(size, TILE_SIZE) for size in settings['boardSizes']]
+
+def getDifficulties(settings):
+    """The difficulties in settings as (name, modifier) pairs."""
+    return [(difficulty['name'], difficulty['modifier']) for difficulty in settings['difficulties']]
+
+def loadDifficulty(name, settings=None):
+    """A difficulty modifier from settings.json by name, or a raw number."""
+    try:
+        return float(name)
+    except ValueError:
+        pass
+
+    for difficultyName, modifier in getDifficulties(settings or loadSettings()):
+        if difficultyName.upper() == name.upper():
+            return modifier
+
+    raise SystemExit("unknown difficulty %s" % name)
@@ -0,0 +1,842 @@
+###########################################################
+# Filename: engine.py
+# Last Modified: 10/18/2026
+#
+# Headless game state and rules. Holds the mine bitmap,
+# neighbor counts and revealed/flagged state in flat
+# arrays so boards can be built and played without pygame
+#
+
+import functools
+import numpy
+import history
+
+MINE = 9
+COVERED = 10
+FLAGGED = 11
+
+NO_CHANGE = numpy.empty(0, dtype=numpy.intp)
+
+# Moves Engine.apply takes
+ACTIONS = ("reveal", "flag", "unflag", "chord")
+
+# Neighbor tables are only kept for boards up to this many tiles. Bigger
+# grids build a tile's neighbors when asked; other topologies refuse them
+TABLE_TILES = 1 << 20
+
+def tileBounds(boardSize, tileSize):
+    """Number of whole tiles that fit on a board of boardSize pixels."""
+    w = int(boardSize[0] / tileSize)
+    if boardSize[0] % tileSize != 0: w = w - 1
+    h = int(boardSize[1] / tileSize)
+    if boardSize[1] % tileSize != 0: h = h - 1
+
+    return (w, h)
+
+def safeRegion(pos):
+    """Index for the 3x3 block around pos, clipped at the top/left edges."""
+    return (slice(max(pos[0] - 1, 0), pos[0] + 2), slice(max(pos[1] - 1, 0), pos[1] + 2))
+
+def placeMines(shape, startPos, mineCount, rng, topology=None):
+    """Pick exactly mineCount mine positions outside the start region (the
+    3x3 block around startPos, or startPos and its neighbors under
+    topology), or anywhere if startPos is None.
+
+    Returns a bool bitmap of the given (w, h) shape.
+    """
+    # Ensures that first click always starts in a blank space
+    allowed = numpy.ones(shape, dtype=numpy.bool_)
+    if startPos is not None and topology is not None:
+        start = startPos[0] * shape[1] + startPos[1]
+        allowed.flat[start] = False
+        allowed.flat[topology.getNeighbors(start)] = False
+    elif startPos is not None:
+        allowed[safeRegion(startPos)] = False
+    candidates = numpy.flatnonzero(allowed)
+
+    mines = numpy.zeros(shape, dtype=numpy.bool_)
+    mines.flat[rng.choice(candidates, min(mineCount, len(candidates)), replace=False)] = True
+
+    return mines
+
+def relocateMines(mines, startPos, rng):
+    """Move the mines in the 3x3 region around startPos to random free
+    tiles outside it, in place.
+
+    A layout placed without knowing the start ends up laid out as if
+    placeMines had been given startPos, at the cost of touching only the
+    mines that have to move.
+    """
+    region = mines[safeRegion(startPos)]
+    moving = int(numpy.count_nonzero(region))
+    if moving:
+        region[:] = False
+        allowed = ~mines
+        allowed[safeRegion(startPos)] = False
+        candidates = numpy.flatnonzero(allowed)
+        mines.flat[rng.choice(candidates, min(moving, len(candidates)), replace=False)] = True
+
+    return mines
+
+def placeLayout(shape, mineCount, seed):
+    """A layout placed ahead of the first click, for Engine.fill's layout."""
+    return placeMines(shape, None, mineCount, numpy.random.default_rng(seed))
+
+def countNeighbors(mask):
+    """Count the set cells in the 8-neighborhood of every cell of mask.
+
+    Sums shifted views of a zero-padded copy, first along x then along y,
+    so the whole board is counted in a handful of array passes. A stack
+    of boards is counted along its last two axes.
+    """
+    w, h = mask.shape[-2:]
+    padded = numpy.zeros(mask.shape[:-2] + (w + 2, h + 2), dtype=numpy.uint8)
+    padded[..., 1:-1, 1:-1] = mask
+
+    rows = padded[..., :-2, :] + padded[..., 1:-1, :] + padded[..., 2:, :]
+    counts = rows[..., :-2] + rows[..., 1:-1] + rows[..., 2:]
+    counts -= padded[..., 1:-1, 1:-1]
+
+    return counts
+
+def connect(parent, a, b):
+    """Union the trees in parent joined by the edges a[i] <-> b[i].
+
+    Every pass hooks the larger root of each unsettled edge under the
+    smaller one and then flattens the forest by pointer jumping, so all
+    of the work is done in whole-array operations. Returns the
+    flattened parent array, where every entry names its component's
+    smallest index.
+    """
+    while True:
+        pa = parent[a]
+        pb = parent[b]
+        unsettled = pa != pb
+        if not unsettled.any():
+            return parent
+
+        a, b, pa, pb = a[unsettled], b[unsettled], pa[unsettled], pb[unsettled]
+        numpy.minimum.at(parent, numpy.maximum(pa, pb), numpy.minimum(pa, pb))
+
+        while True:
+            grandparent = parent[parent]
+            if numpy.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+def indexType(n):
+    """The smallest integer type that can hold a flat index into n cells."""
+    return numpy.int32 if n < 2**31 else numpy.int64
+
+def findOpenings(blank):
+    """Union the 8-connected blank cells of a board, or of a stack of
+    boards along its last two axes.
+
+    Returns the flattened parent array: every blank cell names the
+    smallest flat index of its opening and every other cell itself.
+    """
+    w, h = blank.shape[-2:]
+    n = blank.size
+    blank = blank.reshape(-1, w, h)
+    itype = indexType(n)
+
+    # Runs of blanks along y are the nodes, numbered in board order so the
+    # smallest run of an opening holds its smallest cell
+    starts = blank.copy()
+    starts[..., 1:] &= ~blank[..., :-1]
+    runs = (numpy.cumsum(starts.ravel(), dtype=itype) - 1).reshape(blank.shape)
+    runFirst = numpy.flatnonzero(starts).astype(itype)
+
+    # Two runs in neighboring columns that touch always do so at a cell
+    # where one of them starts, so only those edges are needed. Each
+    # direction is connected on its own to keep few edges alive at once
+    roots = numpy.arange(len(runFirst), dtype=itype)
+    for dx, dy in ((1, 0), (1, 1), (1, -1)):
+        src = (slice(None), slice(0, w - dx), slice(max(-dy, 0), h - max(dy, 0)))
+        dst = (slice(None), slice(dx, w), slice(max(dy, 0), h + min(dy, 0)))
+        both = blank[src] & blank[dst] & (starts[src] | starts[dst])
+        roots = connect(roots, runs[src][both], runs[dst][both])
+
+    parent = numpy.arange(n, dtype=itype)
+    parent[blank.ravel()] = runFirst[roots[runs[blank]]]
+    return parent
+
+# The 8 neighbors in order around the ring, so each follows one it touches
+RING = ((-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1))
+
+def touchingPairs(padded):
+    """Pair every cell with the labels of the openings it touches, padded
+    being a label array with a one cell border.
+
+    A blank touches only its own opening. Any other cell touches one per
+    run of labeled cells in the ring around it, since ring neighbors are
+    8-connected, so each run is listed once where it starts; the rare
+    opening that reaches a cell from two sides is listed twice. Returns
+    (labels, cells) with cells as flat indices into the unpadded array.
+    """
+    w, h = padded.shape[0] - 2, padded.shape[1] - 2
+    own = padded[1:-1, 1:-1]
+
+    labels = [own[own > 0]]
+    cells = [numpy.flatnonzero(own)]
+    for k, (dx, dy) in enumerate(RING):
+        px, py = RING[k - 1]
+        neighbor = padded[1 + dx:1 + dx + w, 1 + dy:1 + dy + h]
+        previous = padded[1 + px:1 + px + w, 1 + py:1 + py + h]
+        x, y = numpy.nonzero((own == 0) & (neighbor > 0) & (previous == 0))
+        labels.append(neighbor[x, y])
+        cells.append(x * h + y)
+
+    return numpy.concatenate(labels), numpy.concatenate(cells)
+
+def sortUnique(keys):
+    keys = numpy.sort(keys)
+    return keys[numpy.concatenate((keys[:1] == keys[:1], keys[1:] != keys[:-1]))]
+
+def labelOpenings(blank, topology=None):
+    """Label the connected regions of blank cells, 8-connected unless a
+    topology says otherwise.
+
+    Returns (labels, offsets, cells): labels numbers each region from 1
+    (0 for cells outside every region) and cells[offsets[l - 1]:offsets[l]]
+    holds the flat indices of region l plus its numbered border, which is
+    everything a click on one of its blanks reveals.
+    """
+    w, h = blank.shape
+    topology = topology or GridTopology(w, h)
+
+    parent = topology.getParent(blank)
+
+    # Every root is its component's smallest index, so ranking the roots
+    # numbers the regions from 1 in board order
+    rank = numpy.cumsum((parent == numpy.arange(w * h, dtype=parent.dtype)) & blank.ravel(), dtype=numpy.int32)
+    labels = numpy.zeros((w, h), dtype=numpy.int32)
+    labels[blank] = rank[parent[blank.ravel()]]
+    regionCount = int(rank[-1]) if len(rank) else 0
+
+    keys = sortUnique(topology.getTouching(labels))
+
+    offsets = numpy.zeros(regionCount + 1, dtype=numpy.intp)
+    offsets[1:] = numpy.searchsorted(keys // (w * h), numpy.arange(1, regionCount + 1), side="right")
+
+    return labels, offsets, keys % (w * h)
+
+class Topology():
+    """Which tiles of a (w, h) board neighbor each other.
+
+    Neighbors are kept in one flat table, built on first use: the
+    neighbors of flat index i are indices[offsets[i]:offsets[i + 1]].
+    Subclasses list the candidate neighbors of many tiles at once in
+    getCandidates; everything else works off the table.
+    """
+    name = None
+
+    def __init__(self, w, h):
+        self.w = w
+        self.h = h
+        self.table = None
+
+    def getCandidates(self, x, y):
+        """(nx, ny, valid) arrays with a row of possible neighbors per tile."""
+        raise NotImplementedError
+
+    def buildRows(self, cells):
+        x, y = numpy.divmod(cells, self.h)
+        nx, ny, valid = self.getCandidates(x, y)
+
+        offsets = numpy.zeros(len(cells) + 1, dtype=numpy.intp)
+        numpy.cumsum(numpy.count_nonzero(valid, axis=1), out=offsets[1:])
+        return offsets, (nx * self.h + ny)[valid].astype(numpy.int32)
+
+    def getTable(self):
+        if self.table is None:
+            if self.w * self.h > TABLE_TILES:
+                raise ValueError("%s boards are limited to %d tiles" % (self.name, TABLE_TILES))
+            self.table = self.buildRows(numpy.arange(self.w * self.h))
+
+        return self.table
+
+    def getNeighbors(self, i):
+        """Flat indices of the tiles around flat index i."""
+        offsets, indices = self.getTable()
+        return indices[offsets[i]:offsets[i + 1]]
+
+    def getRows(self):
+        """The table index each table entry belongs to."""
+        offsets, indices = self.getTable()
+        return numpy.repeat(numpy.arange(self.w * self.h, dtype=numpy.int32), numpy.diff(offsets))
+
+    def countNeighbors(self, mask):
+        offsets, indices = self.getTable()
+        sums = numpy.zeros(len(indices) + 1, dtype=numpy.int32)
+        numpy.cumsum(mask.ravel()[indices], out=sums[1:])
+        return (sums[offsets[1:]] - sums[offsets[:-1]]).astype(numpy.uint8).reshape(self.w, self.h)
+
+    def getParent(self, blank):
+        """findOpenings for this topology."""
+        a, b = self.getBlankEdges(blank)
+        return connect(numpy.arange(self.w * self.h, dtype=indexType(self.w * self.h)), a, b)
+
+    def getBlankEdges(self, blank):
+        """Every pair of neighboring blank cells, once each."""
+        offsets, indices = self.getTable()
+        rows = self.getRows()
+        flat = blank.ravel()
+        both = (rows < indices) & flat[rows] & flat[indices]
+        return rows[both], indices[both]
+
+    def getTouching(self, labels):
+        """label * tiles + cell for every cell and every labeled cell among
+        it and its neighbors, with repeats."""
+        offsets, indices = self.getTable()
+        n = self.w * self.h
+        flat = labels.ravel().astype(numpy.int64)
+
+        neighbor = flat[indices]
+        touching = neighbor > 0
+        own = numpy.flatnonzero(flat)
+        return numpy.concatenate((neighbor[touching] * n + self.getRows()[touching], flat[own] * n + own))
+
+class GridTopology(Topology):
+    """The classic board: 8 neighbors, clipped at the edges. Counting and
+    labeling use shifted views of the board, which beat the table."""
+    name = "grid"
+
+    def getCandidates(self, x, y):
+        dx = numpy.array([-1, -1, -1, 0, 0, 1, 1, 1])
+        dy = numpy.array([-1, 0, 1, -1, 1, -1, 0, 1])
+        nx = x[:, None] + dx
+        ny = y[:, None] + dy
+        return nx, ny, (nx >= 0) & (nx < self.w) & (ny >= 0) & (ny < self.h)
+
+    def getNeighbors(self, i):
+        if self.w * self.h > TABLE_TILES:
+            return self.buildRows(numpy.array([i]))[1]
+
+        return super().getNeighbors(i)
+
+    def countNeighbors(self, mask):
+        return countNeighbors(mask)
+
+    def getParent(self, blank):
+        return findOpenings(blank)
+
+    def getTouching(self, labels):
+        w, h = labels.shape
+        padded = numpy.zeros((w + 2, h + 2), dtype=labels.dtype)
+        padded[1:-1, 1:-1] = labels
+
+        labels, cells = touchingPairs(padded)
+        return labels.astype(numpy.int64) * (w * h) + cells
+
+class TorusTopology(Topology):
+    """8 neighbors, wrapping around every edge."""
+    name = "torus"
+
+    def __init__(self, w, h):
+        if w < 3 or h < 3:
+            raise ValueError("torus boards must be at least 3x3")
+        super().__init__(w, h)
+
+    def getCandidates(self, x, y):
+        dx = numpy.array([-1, -1, -1, 0, 0, 1, 1, 1])
+        dy = numpy.array([-1, 0, 1, -1, 1, -1, 0, 1])
+        nx = (x[:, None] + dx) % self.w
+        ny = (y[:, None] + dy) % self.h
+        return nx, ny, numpy.ones(nx.shape, dtype=numpy.bool_)
+
+    def countNeighbors(self, mask):
+        return countNeighbors(numpy.pad(mask, 1, mode="wrap"))[1:-1, 1:-1]
+
+class HexTopology(Topology):
+    """6 neighbors on hexagons in rows along x, with every odd row (y)
+    pushed half a tile right, clipped at the edges."""
+    name = "hex"
+
+    def getCandidates(self, x, y):
+        odd = (y & 1)[:, None]
+        nx = x[:, None] + numpy.array([-1, 1, -1, 0, -1, 0]) + odd * numpy.array([0, 0, 1, 1, 1, 1])
+        ny = y[:, None] + numpy.array([0, 0, -1, -1, 1, 1])
+        return nx, ny, (nx >= 0) & (nx < self.w) & (ny >= 0) & (ny < self.h)
+
+TOPOLOGIES = {
+    "grid": GridTopology,
+    "torus": TorusTopology,
+    "hex": HexTopology,
+}
+
+@functools.lru_cache(maxsize=16)
+def getTopology(name, w, h):
+    """The shared topology, and so neighbor table, of a board shape."""
+    if name not in TOPOLOGIES:
+        raise ValueError("unknown topology %s" % name)
+
+    return TOPOLOGIES[name](w, h)
+
+class Engine():
+    def __init__(self, w, h, seed=None, topology="grid", historySize=history.HISTORY_SIZE):
+        self.w = w
+        self.h = h
+        self.topology = getTopology(topology, w, h)
+
+        self.mines = numpy.zeros((w, h), dtype=numpy.bool_)
+        self.counts = numpy.zeros((w, h), dtype=numpy.uint8)
+        self.revealed = numpy.zeros((w, h), dtype=numpy.bool_)
+        self.flagged = numpy.zeros((w, h), dtype=numpy.bool_)
+
+        self.rng = numpy.random.default_rng(seed)
+        self.listeners = []
+        self.history = history.History(historySize)
+
+        self.reset()
+
+    def reset(self, notify=True):
+        self.mines.fill(False)
+        self.counts.fill(0)
+        self.revealed.fill(False)
+        self.flagged.fill(False)
+        self.resetState()
+
+        if notify:
+            self.notify(None)
+
+    def resetState(self):
+        """Clear everything about the game but the state arrays."""
+        # Openings are labeled when the board is filled, or on the first
+        # reveal of a restored one
+        self.regions = None
+        self.regionOffsets = numpy.zeros(1, dtype=numpy.intp)
+        self.regionCells = NO_CHANGE
+
+        self.filled = False
+        self.won = False
+        self.lost = False
+
+        self.seed = None
+        self.pregenerated = False
+        self.mineIndex = NO_CHANGE
+        self.mineCount = 0
+        self.flagsLeft = 0
+        self.correctFlags = 0
+        self.wrongFlags = 0
+        self.countUncoveredTiles = 0
+        self.coveredSafeTiles = 0
+        self.totalTiles = self.w * self.h
+
+        self.history.clear()
+        self.pending = []
+
+    def fill(self, startPos, mineCount, seed=None, layout=None, notify=True):
+        """Start a new game with mineCount mines placed around startPos.
+
+        Every game gets its own seed, drawn from the engine's generator
+        unless one is given, and the same seed always lays out the same
+        board. The seed used is kept in self.seed.
+
+        A layout from placeLayout with the same seed, placed before the
+        first click was known, has its mines moved out of the start region
+        instead; self.pregenerated says which way the board was laid out.
+
+        With notify False the listeners are not called, for filling on
+        another thread and notifying them from the one they run on.
+        """
+        if seed is None:
+            seed = int(self.rng.integers(2**63))
+
+        if layout is not None:
+            self.load(relocateMines(layout, startPos, numpy.random.default_rng([seed, 1])), notify=notify)
+        else:
+            self.load(placeMines((self.w, self.h), startPos, mineCount, numpy.random.default_rng(seed), self.topology), notify=notify)
+        self.seed = seed
+        self.pregenerated = layout is not None
+
+    def load(self, mines, counts=None, regions=None, notify=True):
+        """Start a new game on the given (w, h) mine bitmap. Neighbor counts
+        and labelOpenings' regions are worked out unless given."""
+        self.reset(notify)
+
+        self.mines[:] = mines
+        self.mineIndex = numpy.flatnonzero(self.mines)
+        self.mineCount = len(self.mineIndex)
+        self.coveredSafeTiles = self.totalTiles - self.mineCount
+        self.counts = counts if counts is not None else self.topology.countNeighbors(self.mines)
+        if regions is not None:
+            self.regions, self.regionOffsets, self.regionCells = regions
+        else:
+            self.labelRegions()
+
+        self.flagsLeft = self.mineCount
+        self.filled = True
+
+        if notify:
+            self.notify(None)
+
+    def restore(self, mines, revealed, flagged, counts=None, regions=None):
+        """Resume a game from its (w, h) state arrays, which are used as is
+        and may be the engine's own arrays, already written in place.
+
+        Unless labelOpenings' regions are given, openings are only labeled
+        when the first blank is uncovered, so restoring a huge board costs
+        little more than reading its arrays.
+        """
+        self.resetState()
+
+        self.mines = mines
+        self.revealed = revealed
+        self.flagged = flagged
+        self.counts = counts if counts is not None else self.topology.countNeighbors(mines)
+        if regions is not None:
+            self.regions, self.regionOffsets, self.regionCells = regions
+
+        self.mineIndex = numpy.flatnonzero(mines)
+        self.mineCount = len(self.mineIndex)
+        self.countUncoveredTiles = int(numpy.count_nonzero(revealed)) - int(numpy.count_nonzero(revealed.flat[self.mineIndex]))
+        self.coveredSafeTiles = self.totalTiles - self.mineCount - self.countUncoveredTiles
+        self.correctFlags = int(numpy.count_nonzero(flagged.flat[self.mineIndex]))
+        self.wrongFlags = int(numpy.count_nonzero(flagged)) - self.correctFlags
+        self.flagsLeft = self.mineCount - self.correctFlags - self.wrongFlags
+
+        self.filled = True
+        self.lost = bool(revealed.flat[self.mineIndex].any())
+        self.won = not self.lost and (self.coveredSafeTiles == 0 or (self.correctFlags == self.mineCount and self.wrongFlags == 0))
+
+        self.notify(None)
+
+    def labelRegions(self):
+        self.regions, self.regionOffsets, self.regionCells = labelOpenings((self.counts == 0) & ~self.mines, self.topology)
+
+    def addListener(self, listener):
+        """Call listener(changed) after every move with the flat indices of
+        the tiles it changed, or with None when the board is refilled or
+        reset."""
+        self.listeners.append(listener)
+
+    def removeListener(self, listener):
+        self.listeners.remove(listener)
+
+    def notify(self, changed):
+        if changed is not None and not len(changed):
+            return
+
+        for listener in self.listeners:
+            listener(changed)
+
+    def revealMines(self):
+        changed = self.mineIndex[~self.revealed.flat[self.mineIndex]]
+        self.track(changed)
+
+        self.correctFlags = 0
+        self.flagged.flat[self.mineIndex] = False
+        self.revealed.flat[self.mineIndex] = True
+        self.lost = True
+
+        return changed
+
+    def getRegion(self, x, y):
+        """Flat indices of the opening containing the blank tile at (x, y)."""
+        label = self.regions[x, y]
+        return self.regionCells[self.regionOffsets[label - 1]:self.regionOffsets[label]]
+
+    def uncover(self, x, y):
+        """Reveal the tile at (x, y). Blank tiles reveal their whole
+        precomputed opening in one step.
+
+        Returns the flat indices of the tiles whose state changed.
+        """
+        if not self.isPlayable():
+            return NO_CHANGE
+
+        before = self.begin()
+        changed = self.revealTile(x, y)
+        self.settle()
+        self.log([("reveal", x, y)], changed, before)
+        self.notify(changed)
+        return changed
+
+    def flag(self, x, y):
+        """Flip the flag on the tile at (x, y).
+
+        Returns the flat indices of the tiles whose state changed.
+        """
+        if not self.isPlayable():
+            return NO_CHANGE
+
+        before = self.begin()
+        changed = self.flipFlag(x, y)
+        self.settle()
+        self.log([("flag" if self.flagged[x, y] else "unflag", x, y)], changed, before)
+        self.notify(changed)
+        return changed
+
+    def chord(self, x, y):
+        """Reveal every unflagged neighbor of the revealed number at (x, y)
+        once it has as many flags around it as its value.
+
+        Returns the flat indices of the tiles whose state changed.
+        """
+        if not self.isPlayable():
+            return NO_CHANGE
+
+        before = self.begin()
+        changed = self.chordTile(x, y)
+        self.settle()
+        self.log([("chord", x, y)], changed, before)
+        self.notify(changed)
+        return changed
+
+    def apply(self, actions):
+        """Apply a batch of (action, x, y) moves in order.
+
+        action is "reveal", "flag", "unflag" or "chord"; "flag" and
+        "unflag" set and clear a flag rather than flipping it. The win
+        check and listeners run once, after the whole batch, and moves
+        after one that hits a mine are dropped. Returns the flat indices
+        of every tile the batch changed, each once; getLooks gives their
+        new state.
+
+        The whole batch is checked before any of it is applied, so a
+        ValueError for an unknown action or a tile off the board leaves
+        the game as it was.
+        """
+        actions = list(actions)
+        for action, x, y in actions:
+            if action not in ACTIONS:
+                raise ValueError("unknown action %s" % action)
+            if not (0 <= x < self.w and 0 <= y < self.h):
+                raise ValueError("tile (%d, %d) is off the board" % (x, y))
+
+        if not self.isPlayable():
+            return NO_CHANGE
+
+        before = self.begin()
+        changed = []
+        for action, x, y in actions:
+            if self.lost:
+                break
+
+            if action == "reveal":
+                changed.append(self.revealTile(x, y))
+            elif action == "flag" or action == "unflag":
+                if self.flagged[x, y] != (action == "flag"):
+                    changed.append(self.flipFlag(x, y))
+            else:
+                changed.append(self.chordTile(x, y))
+
+        if len(changed) > 1:
+            changed = numpy.unique(numpy.concatenate(changed))
+        else:
+            changed = changed[0] if changed else NO_CHANGE
+        self.settle()
+        self.log(actions, changed, before)
+        self.notify(changed)
+        return changed
+
+    def revealTile(self, x, y):
+        if self.flagged[x, y] or self.revealed[x, y]:
+            return NO_CHANGE
+
+        if self.mines[x, y]:
+            return self.revealMines()
+
+        if self.regions is None:
+            self.labelRegions()
+
+        if self.regions[x, y]:
+            changed = self.getRegion(x, y)
+            changed = changed[~self.revealed.flat[changed] & ~self.flagged.flat[changed]]
+        else:
+            changed = numpy.array([x * self.h + y])
+
+        self.track(changed)
+        self.revealed.flat[changed] = True
+        self.countUncoveredTiles = self.countUncoveredTiles + len(changed)
+        self.coveredSafeTiles = self.coveredSafeTiles - len(changed)
+
+        return changed
+
+    def flipFlag(self, x, y):
+        if self.revealed[x, y]:
+            return NO_CHANGE
+
+        changed = numpy.array([x * self.h + y])
+        self.track(changed)
+
+        inc = 1 if self.flagged[x, y] else -1
+        self.flagsLeft = self.flagsLeft + inc
+        if self.mines[x, y]:
+            self.correctFlags = self.correctFlags - inc
+        else:
+            self.wrongFlags = self.wrongFlags - inc
+        self.flagged[x, y] = not self.flagged[x, y]
+
+        return changed
+
+    def chordTile(self, x, y):
+        if not self.revealed[x, y] or self.mines[x, y]:
+            return NO_CHANGE
+
+        neighbors = self.topology.getNeighbors(x * self.h + y)
+        if numpy.count_nonzero(self.flagged.flat[neighbors]) != self.counts[x, y]:
+            return NO_CHANGE
+
+        changed = []
+        for i in neighbors[~self.revealed.flat[neighbors] & ~self.flagged.flat[neighbors]]:
+            if not self.lost:
+                changed.append(self.revealTile(*self.getPos(i)))
+
+        return numpy.concatenate(changed) if changed else NO_CHANGE
+
+    def track(self, changed):
+        """Note the state of tiles a move is about to change."""
+        if self.history.size:
+            self.pending.append((changed, self.revealed.flat[changed], self.flagged.flat[changed]))
+
+    def log(self, actions, changed, before):
+        """Append the move just made to the history."""
+        pending, self.pending = self.pending, []
+        if not pending or not len(changed):
+            return
+
+        if len(pending) == 1:
+            changed, revealed, flagged = pending[0]
+        else:
+            # A tile changed twice in one batch keeps its state from
+            # before the first change
+            indices, revealed, flagged = (numpy.concatenate(parts) for parts in zip(*pending))
+            order = numpy.argsort(indices, kind="stable")
+            indices = indices[order]
+            first = numpy.ones(len(indices), dtype=numpy.bool_)
+            first[1:] = indices[1:] != indices[:-1]
+            changed = indices[first]
+            revealed = revealed[order][first]
+            flagged = flagged[order][first]
+
+        after = (self.revealed.flat[changed], self.flagged.flat[changed], self.getCounters())
+        self.history.append(history.Delta(actions, changed, (revealed, flagged, before), after))
+
+    def begin(self):
+        """Start recording a move. Returns the counters from before it."""
+        self.pending = []
+        return self.getCounters()
+
+    def getCounters(self):
+        return (self.flagsLeft, self.correctFlags, self.wrongFlags, self.countUncoveredTiles, self.coveredSafeTiles, self.won, self.lost)
+
+    def undo(self):
+        """Take back the last move, even one that lost the game.
+
+        Returns the flat indices of the tiles whose state changed.
+        """
+        move = self.getMoveCount() - 1
+        return self.rewind(move) if move in self.history.getRange() else NO_CHANGE
+
+    def redo(self):
+        """Make the last move taken back again."""
+        move = self.getMoveCount() + 1
+        return self.rewind(move) if move in self.history.getRange() else NO_CHANGE
+
+    def rewind(self, move):
+        """Undo or redo moves until move moves have been made since the
+        board was filled. Costs time proportional to the tiles those moves
+        changed rather than to the board.
+
+        Returns the flat indices of the tiles whose state changed.
+        """
+        if move not in self.history.getRange():
+            raise ValueError("move %d is not in the history" % move)
+
+        changed = []
+        while self.history.getPosition() > move:
+            delta = self.history.back()
+            self.setTiles(delta.changed, delta.before)
+            changed.append(delta.changed)
+        while self.history.getPosition() < move:
+            delta = self.history.forward()
+            self.setTiles(delta.changed, delta.after)
+            changed.append(delta.changed)
+
+        if len(changed) > 1:
+            changed = numpy.unique(numpy.concatenate(changed))
+        else:
+            changed = changed[0] if changed else NO_CHANGE
+        self.notify(changed)
+        return changed
+
+    def setTiles(self, changed, state):
+        revealed, flagged, counters = state
+        self.revealed.flat[changed] = revealed
+        self.flagged.flat[changed] = flagged
+        self.flagsLeft, self.correctFlags, self.wrongFlags, self.countUncoveredTiles, self.coveredSafeTiles, self.won, self.lost = counters
+
+    def getMoveCount(self):
+        """Moves made since the board was filled, less any undone."""
+        return self.history.getPosition()
+
+    def settle(self):
+        """Check for a win after one or more moves."""
+        if not self.lost and (self.coveredSafeTiles == 0 or (self.correctFlags == self.mineCount and self.wrongFlags == 0)):
+            self.won = True
+
+    def getPos(self, i):
+        return divmod(int(i), self.h)
+
+    def getNeighbors(self, i):
+        """Flat indices of the tiles around flat index i."""
+        return self.topology.getNeighbors(int(i)).tolist()
+
+    def getValue(self, x, y):
+        return MINE if self.mines[x, y] else int(self.counts[x, y])
+
+    def getLooks(self, indices):
+        """What each of the flat indices shows, one byte per tile: its
+        value (MINE for a mine) when revealed, else FLAGGED or COVERED."""
+        # Flagged tiles are never revealed, so later masks can overwrite
+        looks = self.counts.flat[indices].astype(numpy.uint8)
+        looks[self.mines.flat[indices]] = MINE
+        looks[~self.revealed.flat[indices]] = COVERED
+        looks[self.flagged.flat[indices]] = FLAGGED
+        return looks
+
+    def getLookMatrix(self):
+        """getLooks for the whole board, shaped (w, h)."""
+        return self.getLooks(slice(None)).reshape(self.w, self.h)
+
+    def isMine(self, x, y):
+        return bool(self.mines[x, y])
+
+    def isUncovered(self, x, y):
+        return bool(self.revealed[x, y])
+
+    def isFlagged(self, x, y):
+        return bool(self.flagged[x, y])
+
+    def isPlayable(self):
+        return self.filled and not self.won and not self.lost
+
+    def getState(self):
+        """new, playing, won or lost."""
+        if not self.filled:
+            return "new"
+        elif self.won:
+            return "won"
+        elif self.lost:
+            return "lost"
+        return "playing"
+
+    def hasWon(self):
+        return self.won
+
+    def hasLost(self):
+        return self.lost
+
+    def getFlagsLeft(self):
+        return self.flagsLeft
+
+    def getFlagCount(self):
+        return self.correctFlags + self.wrongFlags
+
+    def getWrongFlags(self):
+        return self.wrongFlags
+
+    def getBounds(self):
+        return (self.w, self.h)
@@ -0,0 +1,388 @@
+###########################################################
+# Filename: feed.py
+# Last Modified: 10/18/2026
+#
+# live feed of a game for spectators and outside tools.
+# Every move is sent as a diff of the tiles it changed,
+# with the game's state, and a keyframe of the whole board
+# goes out whenever one is cheaper than the diffs since the
+# last, e.g.
+#   python src/main.py --feed unix:/tmp/minesweepyr.sock
+#   python src/feed.py unix:/tmp/minesweepyr.sock
+#
+# Messages are NDJSON, or length-prefixed binary records.
+# A background thread does all the writing; when a sink
+# falls behind its backlog is dropped and it picks up again
+# from the next keyframe, so the game never waits on it
+#
+
+import argparse, base64, collections, json, os, select, socket, struct, sys, threading
+import numpy
+
+FORMATS = ("ndjson", "binary")
+
+STATES = ("new", "playing", "won", "lost")
+
+# Moves between keyframes at most
+KEYFRAME_INTERVAL = 256
+
+# Bytes waiting for the writer, and for each socket client, past which the
+# backlog is dropped for a keyframe
+QUEUE_LIMIT = 8 * 1024 * 1024
+CLIENT_LIMIT = 4 * 1024 * 1024
+
+# Seconds close waits for the writer, which may be stuck on a sink
+CLOSE_TIMEOUT = 5.0
+
+# Binary records: a little-endian u32 length of the rest of the record, then
+# this header and either the keyframe's (w, h) and w * h look bytes, or the
+# diff's tile count, u32 flat indices and look bytes
+LENGTH = struct.Struct("<I")
+HEADER = struct.Struct("<IBIIBi")
+KEYFRAME = 0
+DIFF = 1
+SIZE = struct.Struct("<II")
+COUNT = struct.Struct("<I")
+
+def encodeKeyframe(e, seq, format):
+    looks = e.getLooks(slice(None))
+    if format == "binary":
+        body = SIZE.pack(e.w, e.h) + looks.tobytes()
+        return HEADER.pack(HEADER.size - LENGTH.size + len(body), KEYFRAME, seq, e.getMoveCount(), STATES.index(e.getState()), e.getFlagsLeft()) + body
+
+    return (json.dumps({
+        "type": "keyframe",
+        "seq": seq,
+        "move": e.getMoveCount(),
+        "state": e.getState(),
+        "flagsLeft": int(e.getFlagsLeft()),
+        "size": [e.w, e.h],
+        "looks": base64.b64encode(looks.tobytes()).decode("ascii"),
+    }) + "\n").encode("ascii")
+
+def encodeDiff(e, changed, seq, format):
+    looks = e.getLooks(changed)
+    if format == "binary":
+        body = COUNT.pack(len(changed)) + changed.astype(numpy.uint32).tobytes() + looks.tobytes()
+        return HEADER.pack(HEADER.size - LENGTH.size + len(body), DIFF, seq, e.getMoveCount(), STATES.index(e.getState()), e.getFlagsLeft()) + body
+
+    return (json.dumps({
+        "type": "diff",
+        "seq": seq,
+        "move": e.getMoveCount(),
+        "state": e.getState(),
+        "flagsLeft": int(e.getFlagsLeft()),
+        "tiles": changed.tolist(),
+        "looks": looks.tolist(),
+    }) + "\n").encode("ascii")
+
+class Client():
+    """A spectator on the feed's socket, with the records it hasn't taken
+    yet and how much of the first it has."""
+    def __init__(self, sock, backlog):
+        self.sock = sock
+        self.sock.setblocking(False)
+        self.records = collections.deque(backlog)
+        self.offset = 0
+        self.pending = sum(len(data) for data in backlog)
+
+    def push(self, data, backlog):
+        if self.pending + len(data) <= CLIENT_LIMIT:
+            self.records.append(data)
+            self.pending = self.pending + len(data)
+            return
+
+        # Catch up from the last keyframe, after finishing the record
+        # that's partly sent so the stream stays framed
+        current = [self.records[0]] if self.offset else []
+        self.records = collections.deque(current + backlog)
+        self.pending = sum(len(data) for data in self.records) - self.offset
+
+    def flush(self):
+        while self.records:
+            sent = self.sock.send(memoryview(self.records[0])[self.offset:])
+            self.pending = self.pending - sent
+            if self.offset + sent < len(self.records[0]):
+                self.offset = self.offset + sent
+                return
+            self.records.popleft()
+            self.offset = 0
+
+class Feed():
+    """Streams the moves of an engine to a sink: "-" for stdout,
+    "unix:PATH" for a Unix socket spectators connect to, or any other
+    path, including a named pipe, to write to.
+
+    The engine's listener only encodes each move and queues it, which
+    costs time proportional to the tiles it changed.
+    """
+    def __init__(self, sink, format="ndjson"):
+        if format not in FORMATS:
+            raise ValueError("unknown feed format %s" % format)
+
+        self.sink = sink
+        self.format = format
+        self.engine = None
+        self.blank = None
+        self.seq = 0
+        self.sinceKeyframe = 0
+        self.sinceKeyframeBytes = 0
+
+        self.lock = threading.Lock()
+        self.queue = collections.deque()
+        self.queued = 0
+
+        self.server = None
+        if sink.startswith("unix:"):
+            self.path = sink[len("unix:"):]
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.server.bind(self.path)
+            self.server.listen()
+            self.server.setblocking(False)
+
+        self.wakeReader, self.wakeWriter = socket.socketpair()
+        self.wakeReader.setblocking(False)
+        self.wakeWriter.setblocking(False)
+
+        self.thread = threading.Thread(target=self.run, name="feed", daemon=True)
+        self.thread.start()
+
+    def attach(self, e):
+        """Follow engine e instead of any engine followed before."""
+        if self.engine:
+            self.engine.removeListener(self.update)
+        self.engine = e
+        e.addListener(self.update)
+        self.update(None)
+
+    def detach(self):
+        if self.engine:
+            self.engine.removeListener(self.update)
+            self.engine = None
+
+    def update(self, changed):
+        e = self.engine
+
+        # Resetting an empty board changes nothing a spectator sees
+        if changed is None and not e.filled:
+            if self.blank is e:
+                return
+            self.blank = e
+        else:
+            self.blank = None
+
+        self.seq = self.seq + 1
+
+        # A keyframe replaces the diffs before it once they would take as
+        # long to catch up on
+        keyframe = changed is None or self.sinceKeyframe >= KEYFRAME_INTERVAL or self.sinceKeyframeBytes >= e.totalTiles
+        if keyframe:
+            data = encodeKeyframe(e, self.seq, self.format)
+            self.sinceKeyframe = 0
+            self.sinceKeyframeBytes = 0
+        else:
+            data = encodeDiff(e, changed, self.seq, self.format)
+            self.sinceKeyframe = self.sinceKeyframe + 1
+            self.sinceKeyframeBytes = self.sinceKeyframeBytes + len(data)
+
+        with self.lock:
+            if self.queued + len(data) > QUEUE_LIMIT:
+                self.queue.clear()
+                self.queued = 0
+                if not keyframe:
+                    data = encodeKeyframe(e, self.seq, self.format)
+                    keyframe = True
+                    self.sinceKeyframe = 0
+                    self.sinceKeyframeBytes = 0
+
+            # The writer takes the whole queue when it wakes, so it only
+            # needs waking when the queue was empty
+            idle = not self.queue
+            self.queue.append((keyframe, data))
+            self.queued = self.queued + len(data)
+
+        if idle:
+            self.wake()
+
+    def wake(self):
+        try:
+            self.wakeWriter.send(b"\0")
+        except BlockingIOError:
+            # Already awake with plenty to do
+            pass
+
+    def take(self):
+        with self.lock:
+            messages = list(self.queue)
+            self.queue.clear()
+            self.queued = 0
+        return messages
+
+    def openOutput(self):
+        if self.server:
+            return None
+        if self.sink == "-":
+            return os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+
+        # Opening a named pipe waits for a reader, which is why this
+        # happens on the writer thread
+        return open(self.sink, "wb")
+
+    def run(self):
+        output = self.openOutput()
+        clients = []
+
+        # The last keyframe and the diffs since, all a newcomer or a client
+        # that fell behind needs to catch up
+        backlog = []
+        running = True
+        while running:
+            readable = [self.wakeReader] + ([self.server] if self.server else [])
+            r, w, x = select.select(readable, [c.sock for c in clients if c.pending], [])
+
+            if self.wakeReader in r:
+                try:
+                    while self.wakeReader.recv(4096):
+                        pass
+                except BlockingIOError:
+                    pass
+
+                for keyframe, data in self.take():
+                    if data is None:
+                        running = False
+                        break
+
+                    if keyframe:
+                        backlog = []
+                    backlog.append(data)
+
+                    if output:
+                        try:
+                            output.write(data)
+                        except (BrokenPipeError, OSError):
+                            output = None
+                    for client in clients:
+                        client.push(data, backlog)
+
+                if output:
+                    try:
+                        output.flush()
+                    except (BrokenPipeError, OSError):
+                        output = None
+
+            if self.server in r:
+                try:
+                    clients.append(Client(self.server.accept()[0], backlog))
+                except BlockingIOError:
+                    pass
+
+            for client in [c for c in clients if c.sock in w]:
+                try:
+                    client.flush()
+                except BlockingIOError:
+                    pass
+                except OSError:
+                    client.sock.close()
+                    clients.remove(client)
+
+        for client in clients:
+            client.sock.close()
+        if output:
+            output.close()
+
+    def close(self):
+        """Stop following the engine, and send whatever is queued."""
+        self.detach()
+        with self.lock:
+            self.queue.append((False, None))
+        self.wake()
+        self.thread.join(CLOSE_TIMEOUT)
+
+        self.wakeReader.close()
+        self.wakeWriter.close()
+        if self.server:
+            self.server.close()
+            os.remove(self.path)
+
+def read(inFile, format="ndjson"):
+    """The messages of a feed as dicts like the NDJSON ones, from a binary
+    file object. Looks come back as uint8 arrays."""
+    if format == "ndjson":
+        for line in inFile:
+            message = json.loads(line)
+            message["looks"] = numpy.frombuffer(base64.b64decode(message["looks"]), dtype=numpy.uint8) if message["type"] == "keyframe" else numpy.array(message["looks"], dtype=numpy.uint8)
+            yield message
+        return
+
+    while True:
+        prefix = inFile.read(4)
+        if len(prefix) < 4:
+            return
+        record = prefix + inFile.read(LENGTH.unpack(prefix)[0])
+        length, kind, seq, move, state, flagsLeft = HEADER.unpack_from(record)
+        message = {"type": "keyframe" if kind == KEYFRAME else "diff", "seq": seq, "move": move, "state": STATES[state], "flagsLeft": flagsLeft}
+
+        if kind == KEYFRAME:
+            message["size"] = list(SIZE.unpack_from(record, HEADER.size))
+            message["looks"] = numpy.frombuffer(record, dtype=numpy.uint8, offset=HEADER.size + SIZE.size)
+        else:
+            count = COUNT.unpack_from(record, HEADER.size)[0]
+            start = HEADER.size + COUNT.size
+            message["tiles"] = numpy.frombuffer(record, dtype=numpy.uint32, count=count, offset=start)
+            message["looks"] = numpy.frombuffer(record, dtype=numpy.uint8, count=count, offset=start + 4 * count)
+        yield message
+
+class Spectator():
+    """Rebuilds what the board shows from a feed. Diffs that follow a gap
+    in the sequence are ignored until the next keyframe."""
+    def __init__(self):
+        self.looks = None
+        self.seq = None
+        self.message = None
+
+    def update(self, message):
+        """Fold in a message. Returns whether the board is in sync."""
+        if message["type"] == "keyframe":
+            self.looks = numpy.array(message["looks"], dtype=numpy.uint8)
+        elif self.looks is not None and message["seq"] == self.seq + 1:
+            self.looks[numpy.asarray(message["tiles"], dtype=numpy.intp)] = message["looks"]
+        else:
+            self.looks = None
+
+        self.seq = message["seq"]
+        self.message = message
+        return self.looks is not None
+
+def main():
+    parser = argparse.ArgumentParser(description="Follow a Minesweepyr game feed and print one summary line per message")
+    parser.add_argument("source", help="unix:PATH to connect to a game's feed socket, or a recorded feed file")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    args = parser.parse_args()
+
+    if args.source.startswith("unix:"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(args.source[len("unix:"):])
+        inFile = sock.makefile("rb")
+    else:
+        inFile = open(args.source, "rb")
+
+    spectator = Spectator()
+    try:
+        for message in read(inFile, args.format):
+            synced = spectator.update(message)
+            print(json.dumps({
+                "type": message["type"],
+                "seq": message["seq"],
+                "move": message["move"],
+                "state": message["state"],
+                "flagsLeft": message["flagsLeft"],
+                "tiles": len(message["looks"]),
+                "synced": synced,
+            }), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
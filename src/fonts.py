@@ -0,0 +1,20 @@
+###########################################################
+# Filename: fonts.py
+# Last Modified: 10/18/2026
+#
+# process-wide font cache. Looking a system font up means
+# scanning the installed font list, so each (name, size,
+# bold) is only resolved once and only when first used
+#
+
+import pygame
+
+fonts = {}
+
+def getFont(name, size, bold=False):
+    if (name, size, bold) not in fonts:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        fonts[(name, size, bold)] = pygame.font.SysFont(name, size, bold)
+
+    return fonts[(name, size, bold)]
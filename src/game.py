@@ -1,28 +1,33 @@
 ###########################################################
 # Filename: game.py
 # Author: Shaun Rasmusen <shaunrasmusen@gmail.com>
-# Last Modified: 12/31/2020
+# Last Modified: 10/18/2026
 #
 # Visual elements outside of the tile board
 #
 
 import pygame
-import board
+import board, config, fonts, generator, largeboard, profiler
 import colors as c
-import json
 from collections import deque
 
 FONT = "Courier New"
 
-SETTINGS_FILENAME = 'settings.json'
 TEXT_MARGIN = 5
 
+STATUS_TEXT = ("Congratulations, you won!", "Left click to reveal. Right click to flag.", "Click anywhere on the board to start.", "Generating board...")
+
 class Theme():
+    """Colors and fonts from a settings.json theme entry.
+
+    Only the font names are kept when a theme is parsed; the fonts
+    themselves come from the shared font cache on first use.
+    """
     def __init__(self, themeJSON=None):
         self.name = "Default"
 
-        self.textFont = pygame.font.SysFont("Courier New", 14, False)
-        self.tileFont = pygame.font.SysFont("Courier New", 16, False)
+        self.textFontSpec = (FONT, 14, False)
+        self.tileFontSpec = (FONT, 16, False)
 
         self.textColor = c.WHITE
         self.backgroundColor = c.GRAY
@@ -36,9 +41,9 @@ class Theme():
                 self.name = themeJSON["name"]
 
             if "textFont" in themeJSON:
-                self.textFont = self.processFont(themeJSON["textFont"])
+                self.textFontSpec = self.processFont(themeJSON["textFont"])
             if "tileFont" in themeJSON:
-                self.tileFont = self.processFont(themeJSON["tileFont"])
+                self.tileFontSpec = self.processFont(themeJSON["tileFont"])
 
             if "colors" in themeJSON:
                 colors = themeJSON["colors"]
@@ -61,7 +66,15 @@ class Theme():
         self.boardColor = (abs(self.backgroundColor[0]-16),abs(self.backgroundColor[1]-16),abs(self.backgroundColor[2]-16))
 
     def processFont(self, f):
-        return pygame.font.SysFont(f["name"], f["size"] if "size" in f else 16, f["bold"] if "bold" in f else False)
+        return (f["name"], f["size"] if "size" in f else 16, f["bold"] if "bold" in f else False)
+
+    @property
+    def textFont(self):
+        return fonts.getFont(*self.textFontSpec)
+
+    @property
+    def tileFont(self):
+        return fonts.getFont(*self.tileFontSpec)
 
     def hexStringToRGB(self, hex):
         return (int(hex[0:2], 16), int(hex[2:4], 16), int(hex[4:6], 16))
@@ -77,6 +90,20 @@ class Difficulty():
     def getModifier(self):
         return self.modifier
 
+class BoardSize():
+    def __init__(self, size, large=False):
+        self.size = size
+        self.large = large
+
+    def getName(self):
+        return ("%d x %d tiles" if self.large else "%d x %d") % self.size
+
+    def getSize(self):
+        return self.size
+
+    def isLarge(self):
+        return self.large
+
 class MenuOption():
     def __init__(self, name, options, theme, pos):
         self.theme = theme
@@ -86,12 +113,14 @@ class MenuOption():
         self.options = options
         self.currentOption = self.options.popleft()
 
+        # Rendered labels per theme, so cycling themes only renders each once
+        self.rendered = {}
         self.initText()
 
     def initText(self):
-        self.text = self.theme.textFont.render(self.name, True, self.theme.textColor)
-        self.leftButton = self.theme.textFont.render("<", True, self.theme.textColor)
-        self.rightButton = self.theme.textFont.render(">", True, self.theme.textColor)
+        if self.theme not in self.rendered:
+            self.rendered[self.theme] = [self.theme.textFont.render(text, True, self.theme.textColor) for text in (self.name, "<", ">")]
+        self.text, self.leftButton, self.rightButton = self.rendered[self.theme]
 
         self.textPosition = (self.centerPosition[0] - (self.text.get_width() / 2), self.centerPosition[1])
         self.leftButtonPosition = (self.textPosition[0] - self.leftButton.get_width() - TEXT_MARGIN, self.textPosition[1])
@@ -139,14 +168,15 @@ class MenuOption():
         self.initText()
 
 class Game():
-    def __init__(self, tileSize, screenSize):
+    def __init__(self, tileSize, screenSize, seed=None, recorder=None, profiler=None, renderer="sprite", feed=None):
         self.screenSize = screenSize
+        self.seed = seed
+        self.recorder = recorder
+        self.profiler = profiler
+        self.renderer = renderer
+        self.feed = feed
         
-        settingsText = ""
-        with open(SETTINGS_FILENAME, "r") as inFile:
-            settingsText = inFile.read()
-            
-        settings = json.loads(settingsText)
+        settings = config.loadSettings()
 
         THEMES = deque()
         self.theme = Theme()
@@ -156,12 +186,15 @@ class Game():
                 THEMES.append(Theme(theme))
         
         DIFFICULTIES = deque()
-        for difficulty in settings['difficulties']:
-            DIFFICULTIES.append(Difficulty(difficulty['name'], difficulty['modifier']))
+        for name, modifier in config.getDifficulties(settings):
+            DIFFICULTIES.append(Difficulty(name, modifier))
 
         BOARD_SIZES = deque()
         for boardSize in settings['boardSizes']:
-            BOARD_SIZES.append((boardSize[0], boardSize[1]))
+            BOARD_SIZES.append(BoardSize((boardSize[0], boardSize[1])))
+        if "largeBoardSizes" in settings:
+            for boardSize in settings['largeBoardSizes']:
+                BOARD_SIZES.append(BoardSize((boardSize[0], boardSize[1]), True))
 
         themeOptionPosition = (self.screenSize[0] * 3 / 4, self.screenSize[1] - ((self.theme.textFont.get_height() + TEXT_MARGIN) * 2))
         self.themeOption = MenuOption("THEME", THEMES, self.theme, themeOptionPosition)
@@ -172,45 +205,128 @@ class Game():
         boardSizeOptionPosition = (self.screenSize[0] / 4, self.screenSize[1] - ((self.theme.textFont.get_height() + TEXT_MARGIN) * 2))
         self.boardSizeOption = MenuOption("BOARD SIZE", BOARD_SIZES, self.theme, boardSizeOptionPosition)
 
-        self.gameBoard = board.Board(tileSize, screenSize, self.boardSizeOption.getCurrentOption(), self.difficultyOption.getCurrentOption(), self.theme)
+        # Verified no-guess boards come from a background process pool
+        self.pool = generator.BoardPool() if settings.get("noGuess", False) else None
+
+        self.tileSize = tileSize
+        self.gameBoard = self.createBoard(self.boardSizeOption.getCurrentOption())
         
+        self.rendered = {}
         self.initText()
+        self.invalidate()
 
     def initText(self):
-        self.winText = self.theme.textFont.render("Congratulations, you won!", True, self.theme.textColor)
-        self.howToPlayText = self.theme.textFont.render("Left click to reveal. Right click to flag.", True, self.theme.textColor)
-        self.playAgainText = self.theme.textFont.render("Click anywhere on the board to start.", True, self.theme.textColor)
+        if self.theme not in self.rendered:
+            self.rendered[self.theme] = [self.theme.textFont.render(text, True, self.theme.textColor) for text in STATUS_TEXT]
+        self.winText, self.howToPlayText, self.playAgainText, self.generatingText = self.rendered[self.theme]
+
+        self.flagsLeft = None
+        self.flagsLeftText = None
 
     def draw(self, screen):
-        screen.fill(self.theme.backgroundColor)
+        """Redraw the parts of the screen that changed since the last call.
+
+        Returns the list of screen rects that need to be pushed to the display.
+        """
+        if self.redrawAll:
+            screen.fill(self.theme.backgroundColor)
+
+            self.difficultyOption.draw(screen, (lambda e: e.getName()))
+            self.boardSizeOption.draw(screen, (lambda e: e.getName()))
+            self.themeOption.draw(screen, (lambda e: e.name))
+
+            self.statusRects = [None, None]
+            self.drawnStatus = [None, None]
+            self.gameBoard.invalidate()
 
-        self.difficultyOption.draw(screen, (lambda e: e.getName()))
-        self.boardSizeOption.draw(screen, (lambda e: "%d x %d" % e))
-        self.themeOption.draw(screen, (lambda e: e.name))
+        rects = []
 
+        # A board filled in the background is installed before the status
+        # is read, or it would still say so until the next event
+        self.gameBoard.pollFill()
+        for i, text in enumerate(self.getStatus()):
+            if text is self.drawnStatus[i]:
+                continue
+
+            if self.statusRects[i]:
+                rects.append(screen.fill(self.theme.backgroundColor, self.statusRects[i]))
+
+            position = ((self.screenSize[0] / 2) - (text.get_width() / 2), TEXT_MARGIN + i * (text.get_height() + TEXT_MARGIN))
+            self.statusRects[i] = screen.blit(text, position)
+            self.drawnStatus[i] = text
+            rects.append(self.statusRects[i])
+
+        with profiler.timed(self.profiler, "board"):
+            rects.extend(self.gameBoard.draw(screen))
+
+        if self.redrawAll:
+            self.redrawAll = False
+            return [screen.get_rect()]
+
+        return rects
+
+    def getStatus(self):
         if self.gameBoard.hasWon():
-            screen.blit(self.winText, ((self.screenSize[0] / 2) - (self.winText.get_width() / 2), TEXT_MARGIN))
+            topText = self.winText
         else:
-            flagsLeftText = self.theme.textFont.render("Flags left: %s" % (self.gameBoard.getFlagsLeft()), True, self.theme.textColor)
-            screen.blit(flagsLeftText, ((self.screenSize[0] / 2) - (flagsLeftText.get_width() / 2), TEXT_MARGIN))
-
-        if self.gameBoard.isPlayable():
-            screen.blit(self.howToPlayText, ((self.screenSize[0] / 2) - (self.howToPlayText.get_width() / 2), (self.howToPlayText.get_height() + (TEXT_MARGIN * 2))))
+            if self.gameBoard.getFlagsLeft() != self.flagsLeft:
+                self.flagsLeft = self.gameBoard.getFlagsLeft()
+                self.flagsLeftText = self.theme.textFont.render("Flags left: %s" % (self.flagsLeft), True, self.theme.textColor)
+            topText = self.flagsLeftText
+
+        if self.gameBoard.isGenerating():
+            return (topText, self.generatingText)
+        elif self.gameBoard.isPlayable():
+            return (topText, self.howToPlayText)
         else:
-            screen.blit(self.playAgainText, ((self.screenSize[0] / 2) - (self.playAgainText.get_width() / 2), (self.playAgainText.get_height() + (TEXT_MARGIN * 2))))
+            return (topText, self.playAgainText)
 
-        self.gameBoard.draw(screen)
+    def invalidate(self):
+        self.redrawAll = True
 
     def processClick(self, event):
         if self.themeOption.processClick(event):
             self.theme = self.themeOption.getCurrentOption()
             self.updateTheme()
+            self.invalidate()
         if self.difficultyOption.processClick(event):
             self.gameBoard.setDifficulty(self.difficultyOption.getCurrentOption())
+            self.invalidate()
         if self.boardSizeOption.processClick(event):
-            self.gameBoard.setTileBoardSize(self.boardSizeOption.getCurrentOption())
+            boardSize = self.boardSizeOption.getCurrentOption()
+            if boardSize.isLarge() != isinstance(self.gameBoard, largeboard.LargeBoard):
+                self.gameBoard = self.createBoard(boardSize)
+            else:
+                self.gameBoard.setTileBoardSize(boardSize.getSize())
+            self.invalidate()
         self.gameBoard.processClick(event)
 
+    def processScroll(self, event):
+        self.gameBoard.processScroll(event)
+
+    def undo(self):
+        self.gameBoard.undo()
+
+    def redo(self):
+        self.gameBoard.redo()
+
+    def createBoard(self, boardSize):
+        if boardSize.isLarge():
+            # Chunked engines have no listeners to feed from
+            if self.feed:
+                self.feed.detach()
+            return largeboard.LargeBoard(self.tileSize, self.screenSize, boardSize.getSize(), self.difficultyOption.getCurrentOption(), self.theme, self.seed, self.recorder, self.profiler)
+
+        return board.Board(self.tileSize, self.screenSize, boardSize.getSize(), self.difficultyOption.getCurrentOption(), self.theme, self.pool, self.seed, self.recorder, self.profiler, self.renderer, self.feed)
+
+    def quit(self):
+        if self.pool:
+            self.pool.shutdown()
+        if self.recorder:
+            self.recorder.close()
+        if self.feed:
+            self.feed.close()
+
     def updateTheme(self):
         self.initText()
         self.gameBoard.setTheme(self.theme)
@@ -0,0 +1,176 @@
+###########################################################
+# Filename: generator.py
+# Last Modified: 10/18/2026
+#
+# No-guess board generation. Candidate layouts are built
+# and checked with the solver in worker processes, and a
+# few verified boards per size and difficulty are kept
+# ready so the first click only has to look one up
+#
+
+import concurrent.futures, os, threading
+import numpy
+import engine, solver
+
+POOL_SIZE = 8
+
+# Candidates a worker tries per task before handing back nothing
+ATTEMPTS_PER_TASK = 64
+
+# Empty-handed tasks in a row after which a size is given up on; dense
+# boards are almost never solvable without guessing
+MAX_FAILED_TASKS = 16
+
+class NoGuessBoard():
+    def __init__(self, mines, startPos):
+        self.mines = mines
+        self.startPos = startPos
+
+        # Clicking any blank of the start opening reveals the same tiles,
+        # so the board is solvable from all of them
+        labels = engine.labelOpenings((engine.countNeighbors(mines) == 0) & ~mines)[0]
+        self.opening = labels == labels[startPos]
+
+    def orient(self, pos):
+        """Find a mirror image of this board whose start opening covers pos.
+
+        Returns the mirrored mine bitmap, or None if no mirror fits.
+        """
+        w, h = self.mines.shape
+        for flipX in (False, True):
+            for flipY in (False, True):
+                x = w - 1 - pos[0] if flipX else pos[0]
+                y = h - 1 - pos[1] if flipY else pos[1]
+                if self.opening[x, y]:
+                    return self.mines[::-1 if flipX else 1, ::-1 if flipY else 1]
+
+        return None
+
+def isSolvable(mines, startPos):
+    """Whether the solver can clear the board from startPos without guessing."""
+    e = engine.Engine(*mines.shape, historySize=0)
+    s = solver.Solver(e)
+    e.load(mines)
+
+    e.uncover(*startPos)
+    while e.isPlayable():
+        safe = s.getSafe()
+        if not safe:
+            return False
+
+        for i in safe:
+            e.uncover(*e.getPos(i))
+
+    return e.hasWon()
+
+def generate(w, h, mineCount, seed, attempts=ATTEMPTS_PER_TASK, startPos=None):
+    """Try up to attempts random layouts and return the first one that can
+    be solved without guessing as a NoGuessBoard, or None. Without a
+    startPos every candidate starts from a random tile."""
+    rng = numpy.random.default_rng(seed)
+
+    for attempt in range(attempts):
+        start = startPos if startPos else (int(rng.integers(w)), int(rng.integers(h)))
+        mines = engine.placeMines((w, h), start, mineCount, rng)
+        if isSolvable(mines, start):
+            return NoGuessBoard(mines, start)
+
+    return None
+
+class BoardPool():
+    """Bounded pool of verified no-guess boards per (w, h, mineCount),
+    kept topped up by a process pool in the background."""
+    def __init__(self, size=POOL_SIZE, workers=None):
+        self.size = size
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = concurrent.futures.ProcessPoolExecutor(self.workers)
+
+        self.boards = {}
+        self.pending = {}
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.seeds = numpy.random.SeedSequence()
+        self.closed = False
+
+    def request(self, w, h, mineCount):
+        """Start generating boards for this size until its pool is full."""
+        key = (w, h, mineCount)
+        with self.lock:
+            if self.closed or self.failures.get(key, 0) >= MAX_FAILED_TASKS:
+                return
+
+            missing = max(self.size - len(self.boards.setdefault(key, [])) - self.pending.get(key, 0), 0)
+            self.pending[key] = self.pending.get(key, 0) + missing
+            seeds = self.seeds.spawn(missing)
+
+        # Outside the lock: a future that is already done runs collect,
+        # which takes the lock, from within add_done_callback
+        for seed in seeds:
+            try:
+                future = self.executor.submit(generate, w, h, mineCount, seed)
+            except RuntimeError:
+                # Shut down since the lock was released
+                with self.lock:
+                    self.pending[key] = self.pending[key] - 1
+                continue
+            future.add_done_callback(lambda future, key=key: self.collect(key, future))
+
+    def collect(self, key, future):
+        with self.lock:
+            self.pending[key] = self.pending[key] - 1
+            if future.cancelled() or future.exception():
+                return
+
+            if future.result():
+                self.boards[key].append(future.result())
+                self.failures[key] = 0
+            else:
+                self.failures[key] = self.failures.get(key, 0) + 1
+
+        self.request(*key)
+
+    def take(self, w, h, mineCount, startPos):
+        """A no-guess mine bitmap whose start opening contains startPos.
+
+        Comes straight from the pool when a pooled board (or its mirror
+        image) fits the click; otherwise every worker searches for one from
+        startPos and the first hit wins. Returns None if none was found.
+
+        On a cold pool this blocks the calling thread until the search ends,
+        so Board only calls it from its background fill.
+        """
+        key = (w, h, mineCount)
+        mines = None
+
+        with self.lock:
+            for board in self.boards.get(key, []):
+                mines = board.orient(startPos)
+                if mines is not None:
+                    self.boards[key].remove(board)
+                    break
+
+        self.request(w, h, mineCount)
+        if mines is not None:
+            return numpy.ascontiguousarray(mines)
+
+        with self.lock:
+            seeds = self.seeds.spawn(self.workers)
+        futures = [self.executor.submit(generate, w, h, mineCount, seed, ATTEMPTS_PER_TASK, startPos) for seed in seeds]
+        for future in concurrent.futures.as_completed(futures):
+            if future.result():
+                for other in futures:
+                    other.cancel()
+                return future.result().mines
+
+        return None
+
+    def getPooled(self, w, h, mineCount):
+        with self.lock:
+            return len(self.boards.get((w, h, mineCount), []))
+
+    def shutdown(self):
+        """Drop the queued boards and wait for the ones being generated, so
+        no worker is still writing to its pipe as the interpreter exits."""
+        with self.lock:
+            self.closed = True
+        self.executor.shutdown(wait=True, cancel_futures=True)
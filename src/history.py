@@ -0,0 +1,83 @@
+###########################################################
+# Filename: history.py
+# Last Modified: 10/18/2026
+#
+# append-only log of the moves made on an engine. Each
+# entry holds the moves, the flat indices of the tiles they
+# changed, and their revealed and flagged bits and the
+# engine's counters on either side, so undoing or redoing
+# a move costs time proportional to the tiles it changed
+#
+
+import collections
+
+# Bytes of deltas kept per engine; the oldest moves are dropped past it
+HISTORY_SIZE = 16 * 1024 * 1024
+
+# What a delta costs in memory, as measured with tracemalloc: a fixed part
+# for its tuples, arrays and counters, a part per action, and the index and
+# four bits of each tile
+DELTA_BYTES = 1152
+ACTION_BYTES = 136
+TILE_BYTES = 4
+
+# before and after are each the changed tiles' (revealed, flagged) bits
+# plus Engine.getCounters
+Delta = collections.namedtuple("Delta", ("actions", "changed", "before", "after"))
+
+class History():
+    """The deltas of the moves since the board was filled, with a cursor
+    that undo and redo walk back and forth. A new move after an undo
+    drops the moves that were undone.
+
+    Moves are numbered from 0 at the fill and keep their number when old
+    ones are dropped to stay within size bytes. A size of 0 records
+    nothing.
+    """
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        self.deltas = collections.deque()
+        self.first = 0
+        self.position = 0
+        self.bytes = 0
+
+    def append(self, delta):
+        while len(self.deltas) > self.position - self.first:
+            self.bytes = self.bytes - getBytes(self.deltas.pop())
+
+        self.deltas.append(delta)
+        self.position = self.position + 1
+        self.bytes = self.bytes + getBytes(delta)
+
+        while self.bytes > self.size and self.deltas:
+            self.bytes = self.bytes - getBytes(self.deltas.popleft())
+            self.first = self.first + 1
+
+    def back(self):
+        """Step back over the last move, returning its delta, or None if
+        there is nothing left to undo."""
+        if self.position == self.first:
+            return None
+
+        self.position = self.position - 1
+        return self.deltas[self.position - self.first]
+
+    def forward(self):
+        if self.position - self.first == len(self.deltas):
+            return None
+
+        self.position = self.position + 1
+        return self.deltas[self.position - self.first - 1]
+
+    def getPosition(self):
+        return self.position
+
+    def getRange(self):
+        """The moves that can be rewound to, as a range."""
+        return range(self.first, self.first + len(self.deltas) + 1)
+
+def getBytes(delta):
+    return DELTA_BYTES + ACTION_BYTES * len(delta.actions) + delta.changed.nbytes + TILE_BYTES * len(delta.changed)
@@ -0,0 +1,273 @@
+###########################################################
+# Filename: largeboard.py
+# Last Modified: 10/18/2026
+#
+# Scrollable view over a chunked board. Only the chunks
+# under the camera are materialized and drawn, so memory
+# and frame time follow the viewport, not the board
+#
+
+import pygame
+import numpy
+import atlas, chunks, engine, profiler
+
+VIEWPORT_SIZE = (576, 384)
+
+# Pixels moved per arrow key press or wheel notch
+SCROLL_STEP = 64
+
+SCROLL_KEYS = {
+    pygame.K_LEFT: (-1, 0), pygame.K_a: (-1, 0),
+    pygame.K_RIGHT: (1, 0), pygame.K_d: (1, 0),
+    pygame.K_UP: (0, -1), pygame.K_w: (0, -1),
+    pygame.K_DOWN: (0, 1), pygame.K_s: (0, 1),
+}
+
+class Camera():
+    def __init__(self, viewSize, worldSize):
+        self.viewSize = viewSize
+        self.worldSize = worldSize
+        self.x = 0
+        self.y = 0
+
+    def move(self, dx, dy):
+        """Move the camera, clamped to the world. Returns whether it moved."""
+        x = max(0, min(self.x + dx, self.worldSize[0] - self.viewSize[0]))
+        y = max(0, min(self.y + dy, self.worldSize[1] - self.viewSize[1]))
+        moved = (x, y) != (self.x, self.y)
+        self.x, self.y = x, y
+
+        return moved
+
+    def centerOn(self, x, y):
+        self.move(x - self.viewSize[0] // 2 - self.x, y - self.viewSize[1] // 2 - self.y)
+
+    def getVisibleChunks(self, chunkPixels, chunkBounds):
+        x0 = self.x // chunkPixels
+        y0 = self.y // chunkPixels
+        x1 = min((self.x + self.viewSize[0] - 1) // chunkPixels + 1, chunkBounds[0])
+        y1 = min((self.y + self.viewSize[1] - 1) // chunkPixels + 1, chunkBounds[1])
+
+        return [(cx, cy) for cx in range(x0, x1) for cy in range(y0, y1)]
+
+class LargeBoard():
+    def __init__(self, tileSize, screenSize, tileBounds, difficulty, theme, seed=None, recorder=None, profiler=None):
+        self.tileSize = tileSize
+        self.screenSize = screenSize
+        self.difficulty = difficulty
+        self.theme = theme
+        self.seed = seed
+        self.recorder = recorder
+        self.profiler = profiler
+
+        self.tileBoard = pygame.Surface(VIEWPORT_SIZE, depth=8)
+        self.tileBoard.set_palette(atlas.getAtlas(theme, tileSize).getPalette())
+        self.tileBoardOverlay = pygame.Surface(VIEWPORT_SIZE)
+        self.tileBoardOverlay.set_alpha(64, pygame.RLEACCEL)
+
+        self.setTileBoardSize(tileBounds)
+
+    def draw(self, screen):
+        """Draw the viewport if anything in it changed since the last call.
+
+        Returns the list of screen rects that were touched.
+        """
+        if self.isPlayable() != self.drawnPlayable:
+            self.invalidate()
+
+        visible = self.camera.getVisibleChunks(self.getChunkPixels(), self.engine.getChunkBounds())
+        if self.engine.filled:
+            for key in visible:
+                # Resuming a parked flood changes the game, so it is
+                # recorded like a click
+                if key in self.engine.pending:
+                    self.markDirty(self.record("activate", *key))
+                else:
+                    self.engine.activate(*key)
+
+        if not self.redrawAll and not self.dirtyChunks.intersection(visible):
+            self.dirtyChunks = set()
+            return []
+
+        if self.profiler:
+            self.profiler.count("chunks_redrawn", len(visible) if self.redrawAll else len(self.dirtyChunks.intersection(visible)))
+
+        self.tileBoard.fill(atlas.BOARD)
+        for key in visible:
+            position = (key[0] * self.getChunkPixels() - self.camera.x, key[1] * self.getChunkPixels() - self.camera.y)
+            self.tileBoard.blit(self.getChunkSurface(key), position)
+
+        # Only the chunks in view keep a rendered surface
+        for key in list(self.chunkSurfaces):
+            if key not in visible:
+                del self.chunkSurfaces[key]
+
+        rect = screen.blit(self.tileBoard, self.getTileBoardOrigin())
+        if not self.isPlayable():
+            self.tileBoardOverlay.fill(self.theme.boardColor)
+            screen.blit(self.tileBoardOverlay, self.getTileBoardOrigin())
+
+        self.redrawAll = False
+        self.drawnPlayable = self.isPlayable()
+        self.dirtyChunks = set()
+        return [rect]
+
+    def getChunkSurface(self, key):
+        if key in self.chunkSurfaces and key not in self.dirtyChunks:
+            return self.chunkSurfaces[key]
+
+        w, h = self.engine.getChunkShape(key)
+        tileAtlas = atlas.getAtlas(self.theme, self.tileSize)
+        surface = pygame.Surface((w * self.tileSize, h * self.tileSize), depth=8)
+        surface.set_palette(tileAtlas.getPalette())
+
+        if self.engine.hasChunk(key):
+            looks = self.engine.getChunk(key).getLookMatrix()
+        else:
+            looks = numpy.full((w, h), atlas.COVERED, dtype=numpy.uint8)
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        tileAtlas.compose(looks, pixels)
+        del pixels
+
+        self.chunkSurfaces[key] = surface
+        return surface
+
+    def markDirty(self, changed):
+        x, y = numpy.divmod(changed, self.engine.h)
+        keys = numpy.unique((x // chunks.CHUNK_SIZE) * self.engine.ch + y // chunks.CHUNK_SIZE)
+        self.dirtyChunks.update(divmod(int(key), self.engine.ch) for key in keys)
+
+    def invalidate(self):
+        self.redrawAll = True
+        self.chunkSurfaces = {}
+
+    def processClick(self, event):
+        if event.button not in (1, 3):
+            return
+
+        x, y = event.pos
+        bcw, bch = self.getTileBoardOrigin()
+        x = int(x - bcw)
+        y = int(y - bch)
+
+        if self.tileBoard.get_rect().collidepoint((x, y)):
+            scaledX = int((x + self.camera.x) / self.tileSize)
+            scaledY = int((y + self.camera.y) / self.tileSize)
+            if scaledX >= self.engine.w or scaledY >= self.engine.h:
+                return
+
+            if not self.isPlayable():
+                self.fillBoard((scaledX, scaledY))
+
+            if event.button == 1:
+                if not self.engine.isFlagged(scaledX, scaledY):
+                    self.markDirty(self.record("uncover", scaledX, scaledY))
+            else:
+                if not self.engine.isUncovered(scaledX, scaledY):
+                    self.markDirty(self.record("flag", scaledX, scaledY))
+
+    def record(self, action, x, y):
+        changed = getattr(self.engine, action)(x, y)
+        if self.recorder:
+            self.recorder.recordAction(action, x, y, changed)
+        if self.profiler and action == "uncover":
+            self.profiler.count("revealed", len(changed))
+        return changed
+
+    # Chunked engines keep no history
+    def undo(self):
+        return engine.NO_CHANGE
+
+    def redo(self):
+        return engine.NO_CHANGE
+
+    def processScroll(self, event):
+        if event.type == pygame.KEYDOWN and event.key in SCROLL_KEYS:
+            dx, dy = SCROLL_KEYS[event.key]
+        elif event.type == pygame.MOUSEWHEEL:
+            dx, dy = event.x, -event.y
+        else:
+            return
+
+        if self.camera.move(dx * SCROLL_STEP, dy * SCROLL_STEP):
+            self.redrawAll = True
+
+    def fillBoard(self, startPos):
+        w, h = self.engine.getBounds()
+        with profiler.timed(self.profiler, "fill"):
+            self.engine.fill(startPos, int(w * h * self.difficulty.getModifier()), int(self.rng.integers(2**63)))
+        if self.recorder:
+            self.recorder.recordGame(self.engine, startPos)
+        self.invalidate()
+
+    def resetGame(self):
+        self.engine.reset()
+        self.dirtyChunks = set()
+        self.invalidate()
+
+    def getChunkPixels(self):
+        return chunks.CHUNK_SIZE * self.tileSize
+
+    def getTileBoard(self):
+        return self.tileBoard
+
+    def getTileBoardRelativeCenter(self):
+        return ((self.screenSize[0] / 2) - (self.tileBoard.get_width() / 2), (self.screenSize[1] / 2) - (self.tileBoard.get_height() / 2))
+
+    def getTileBoardOrigin(self):
+        x, y = self.getTileBoardRelativeCenter()
+        return (int(x), int(y))
+
+    def getTileSize(self):
+        return self.tileSize
+
+    def getFlagsLeft(self):
+        return self.engine.getFlagsLeft()
+
+    def hasWon(self):
+        return self.engine.hasWon()
+
+    def isPlayable(self):
+        return self.engine.isPlayable()
+
+    def isGenerating(self):
+        # Chunks are laid out on demand, so filling never takes long
+        return False
+
+    def pollFill(self):
+        return
+
+    def getEngine(self):
+        return self.engine
+
+    def getTileBoardSize(self):
+        return self.engine.getBounds()
+
+    def setTileBoardSize(self, tileBounds):
+        self.engine = chunks.ChunkedEngine(*tileBounds)
+        self.rng = numpy.random.default_rng(self.seed)
+        self.camera = Camera(VIEWPORT_SIZE, (tileBounds[0] * self.tileSize, tileBounds[1] * self.tileSize))
+        self.camera.centerOn(tileBounds[0] * self.tileSize // 2, tileBounds[1] * self.tileSize // 2)
+        self.drawnPlayable = False
+        self.resetGame()
+
+    def getDifficulty(self):
+        return self.difficulty
+
+    def setDifficulty(self, d):
+        self.difficulty = d
+        self.resetGame()
+
+    def setTheme(self, theme):
+        fontChanged = theme.tileFontSpec != self.theme.tileFontSpec
+        self.theme = theme
+
+        palette = atlas.getAtlas(theme, self.tileSize).getPalette()
+        self.tileBoard.set_palette(palette)
+        if fontChanged:
+            self.invalidate()
+        else:
+            for surface in self.chunkSurfaces.values():
+                surface.set_palette(palette)
+            self.redrawAll = True
@@ -0,0 +1,169 @@
+###########################################################
+# Filename: loadgen.py
+# Last Modified: 10/18/2026
+#
+# load generator for server.py. Opens a number of
+# connections, keeps a number of games going on each and
+# pipelines one move per game per round, then
+# reports throughput and round latency as JSON, e.g.
+#   python src/loadgen.py --connections 8 --games 1000 --seconds 10
+#
+
+import argparse, asyncio, json, random, time
+import engine, server, simulate
+
+class Player():
+    """Plays one game from the diffs alone: chords a number once its
+    flags are all placed, flags the covered neighbors of a number that
+    has exactly that many left, and otherwise reveals a random covered
+    tile."""
+    def __init__(self, w, h, rng):
+        self.w = w
+        self.h = h
+        self.rng = rng
+        self.gameId = None
+
+    def start(self, gameId):
+        self.gameId = gameId
+        self.looks = bytearray([engine.COVERED]) * (self.w * self.h)
+        self.order = list(range(self.w * self.h))
+        self.rng.shuffle(self.order)
+        self.work = set()
+
+    def getNeighbors(self, i):
+        x, y = divmod(i, self.h)
+        return [x1 * self.h + y1
+            for x1 in range(max(x - 1, 0), min(x + 2, self.w))
+            for y1 in range(max(y - 1, 0), min(y + 2, self.h))
+            if x1 != x or y1 != y]
+
+    def move(self):
+        while self.work:
+            i = self.work.pop()
+            neighbors = self.getNeighbors(i)
+            covered = [n for n in neighbors if self.looks[n] == engine.COVERED]
+            if not covered:
+                continue
+
+            flagged = sum(1 for n in neighbors if self.looks[n] == engine.FLAGGED)
+            if flagged == self.looks[i]:
+                return "CHORD %d %d %d" % ((self.gameId,) + divmod(i, self.h))
+            if flagged + len(covered) == self.looks[i]:
+                return "BATCH %d %s" % (self.gameId, " ".join("FLAG %d %d" % divmod(n, self.h) for n in covered))
+
+        while self.order:
+            i = self.order.pop()
+            if self.looks[i] == engine.COVERED:
+                return "REVEAL %d %d %d" % ((self.gameId,) + divmod(i, self.h))
+
+        return None
+
+    def update(self, reply):
+        """Fold a move's diff into what the player can see. Returns
+        whether the game is still going."""
+        words = reply.split()
+        if words[0] != "OK":
+            raise RuntimeError(reply)
+
+        for pair in words[3:]:
+            i, look = pair.split(":")
+            i = int(i)
+            self.looks[i] = int(look)
+            for n in self.getNeighbors(i) + [i]:
+                if 0 < self.looks[n] < engine.MINE:
+                    self.work.add(n)
+
+        return words[1] in ("new", "playing")
+
+async def request(reader, writer, lines):
+    """Send lines in one write and read back one reply per line."""
+    writer.write("".join(line + "\n" for line in lines).encode("ascii"))
+    return [(await reader.readline()).decode("ascii") for line in lines]
+
+async def connection(args, games, deadline, seed, stats):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix, limit=1 << 24)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port, limit=1 << 24)
+
+    rng = random.Random(seed)
+    newGame = "NEW %d %d %d" % (args.width, args.height, args.mines)
+    players = [Player(args.width, args.height, rng) for n in range(games)]
+    for player, reply in zip(players, await request(reader, writer, [newGame] * games)):
+        player.start(int(reply.split()[1]))
+
+    # Every round pipelines one move for each game on the connection
+    while time.perf_counter() < deadline:
+        moving = []
+        finished = []
+        for player in players:
+            move = player.move()
+            if move is None:
+                finished.append(player)
+            else:
+                moving.append((player, move))
+
+        t = time.perf_counter()
+        replies = await request(reader, writer, [move for player, move in moving])
+        stats["rounds"].append(time.perf_counter() - t)
+        stats["moves"] = stats["moves"] + len(moving)
+
+        for (player, move), reply in zip(moving, replies):
+            if not player.update(reply):
+                finished.append(player)
+
+        if finished:
+            replies = await request(reader, writer, [line for player in finished for line in ("CLOSE %d" % player.gameId, newGame)])
+            for player, reply in zip(finished, replies[1::2]):
+                player.start(int(reply.split()[1]))
+            stats["games"] = stats["games"] + len(finished)
+
+    writer.close()
+
+async def run(args):
+    stats = {"games": 0, "moves": 0, "rounds": []}
+    start = time.perf_counter()
+    deadline = start + args.seconds
+
+    perConnection = [args.games // args.connections + (n < args.games % args.connections) for n in range(args.connections)]
+    await asyncio.gather(*(connection(args, games, deadline, args.seed + n, stats) for n, games in enumerate(perConnection)))
+    elapsed = time.perf_counter() - start
+
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    serverStats = json.loads((await request(reader, writer, ["STATS"]))[0][3:])
+    writer.close()
+
+    return {
+        "connections": args.connections,
+        "concurrent_games": args.games,
+        "size": [args.width, args.height],
+        "mines": args.mines,
+        "seconds": round(elapsed, 3),
+        "requests": stats["moves"],
+        "requests_per_second": round(stats["moves"] / elapsed, 1),
+        "games_finished": stats["games"],
+        "round_trip": simulate.summarize(stats["rounds"]),
+        "server": serverStats,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive a Minesweepyr game server with random players")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--games", type=int, default=100, help="games kept going at once, spread over the connections")
+    parser.add_argument("--width", type=int, default=16)
+    parser.add_argument("--height", type=int, default=16)
+    parser.add_argument("--mines", type=int, default=40)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,93 @@
 ###########################################################
 # Filename: main.py
 # Author: Shaun Rasmusen <shaunrasmusen@gmail.com>
-# Last Modified: 12/31/2020
+# Last Modified: 10/18/2026
 #
 # entrypoint and main loop
 #
 
-import sys, pygame
-import colors, game
+import argparse, sys, pygame
+import board, colors, config, feed, game, profiler, recorder
 
-pygame.init()
+PROFILE_KEY = pygame.K_F3
 
-pygame.display.set_caption("Minesweepyr")
-screen = pygame.display.set_mode((640, 480))
+# With Ctrl held; Ctrl+Shift+Z redoes as well
+UNDO_KEY = pygame.K_z
+REDO_KEY = pygame.K_y
 
-game = game.Game(16, screen.get_size())
-game.draw(screen)
+# Wakes the loop while the overlay is shown so it keeps updating
+PROFILE_EVENT = pygame.USEREVENT
 
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            game.processClick(event)
-                
-    game.draw(screen)
-    
+def main():
+    parser = argparse.ArgumentParser(description="Minesweepyr")
+    parser.add_argument("--seed", type=int, default=None, help="seed the session so every board can be reproduced")
+    parser.add_argument("--record", metavar="PATH", help="record the seed and every board action to PATH for src/replay.py")
+    parser.add_argument("--profile", metavar="PATH", help="write loop timings and metrics to PATH every second, as CSV if it ends in .csv and JSON lines otherwise")
+    parser.add_argument("--feed", metavar="SINK", help="stream every move to SINK for spectators: a file or named pipe path, - for stdout, or unix:PATH to serve a Unix socket")
+    parser.add_argument("--feed-format", choices=feed.FORMATS, default="ndjson")
+    parser.add_argument("--renderer", choices=board.RENDERERS, default="sprite", help="draw the board one sprite per tile or straight from the game state arrays")
+    args = parser.parse_args()
+
+    pygame.init()
+
+    pygame.display.set_caption("Minesweepyr")
+    screen = pygame.display.set_mode((640, 480))
+
+    # Nothing reacts to the pointer moving, so don't wake up for it
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+    pygame.key.set_repeat(250, 30)
+
+    sessionRecorder = recorder.Recorder(args.record) if args.record else None
+    loopProfiler = profiler.Profiler(args.profile)
+    gameFeed = feed.Feed(args.feed, args.feed_format) if args.feed else None
+    minesweeper = game.Game(config.TILE_SIZE, screen.get_size(), args.seed, sessionRecorder, loopProfiler, args.renderer, gameFeed)
+    minesweeper.draw(screen)
     pygame.display.flip()
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+    if args.profile:
+        pygame.time.set_timer(PROFILE_EVENT, int(profiler.REPORT_INTERVAL * 1000))
+
+    running = True
+    while running:
+        # Sleep until something happens, then drain whatever else queued up
+        events = [pygame.event.wait()] + pygame.event.get()
+
+        with loopProfiler.phase("events"):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    minesweeper.processClick(event)
+                elif event.type == pygame.KEYDOWN and event.key == PROFILE_KEY:
+                    loopProfiler.toggle()
+                    if not args.profile:
+                        pygame.time.set_timer(PROFILE_EVENT, int(profiler.REPORT_INTERVAL * 1000) if loopProfiler.isShown() else 0)
+                    minesweeper.invalidate()
+                elif event.type == pygame.KEYDOWN and event.key in (UNDO_KEY, REDO_KEY) and event.mod & pygame.KMOD_CTRL:
+                    if event.key == REDO_KEY or event.mod & pygame.KMOD_SHIFT:
+                        minesweeper.redo()
+                    else:
+                        minesweeper.undo()
+                elif event.type in (pygame.KEYDOWN, pygame.MOUSEWHEEL):
+                    minesweeper.processScroll(event)
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    minesweeper.invalidate()
+
+        with loopProfiler.phase("draw"):
+            rects = minesweeper.draw(screen)
+            rects.extend(loopProfiler.draw(screen))
+
+        with loopProfiler.phase("flip"):
+            if rects:
+                pygame.display.update(rects)
+
+        loopProfiler.endFrame()
+
+    minesweeper.quit()
+    loopProfiler.close()
+    pygame.quit()
+    sys.exit()
+
+# Worker processes re-import this module, so only run the game when started
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+###########################################################
+# Filename: profiler.py
+# Last Modified: 10/18/2026
+#
+# opt-in instrumentation for the game loop. Times the loop
+# phases, counts per-action metrics, shows the last interval
+# in an overlay and writes every interval to a JSON lines
+# or CSV file
+#
+
+import contextlib, csv, json, time
+import pygame
+import fonts
+
+# Seconds per reported interval
+REPORT_INTERVAL = 1.0
+
+OVERLAY_FONT = ("Courier New", 12, False)
+OVERLAY_WIDTH = 300
+
+class Stat():
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.count = self.count + 1
+        self.total = self.total + value
+        self.max = max(self.max, value)
+
+    def getMean(self):
+        return self.total / self.count if self.count else 0.0
+
+class Profiler():
+    """Collects phase timings (seconds) and metrics (plain numbers) into
+    REPORT_INTERVAL long intervals. Nothing is written unless a path is
+    given, and the overlay only draws while shown."""
+    def __init__(self, path=None, interval=REPORT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.shown = False
+
+        self.outFile = None
+        self.writer = None
+        if path:
+            self.outFile = open(path, "w", newline="")
+            if path.endswith(".csv"):
+                self.writer = csv.writer(self.outFile)
+                self.writer.writerow(["t", "kind", "name", "count", "mean", "max", "total"])
+
+        self.start = time.perf_counter()
+        self.intervalStart = self.start
+        self.frames = 0
+        self.phases = {}
+        self.metrics = {}
+        self.last = None
+
+        self.overlay = None
+        self.overlayHeight = 0
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.time(name, time.perf_counter() - t)
+
+    def time(self, name, seconds):
+        self.phases.setdefault(name, Stat()).add(seconds)
+
+    def count(self, name, value):
+        self.metrics.setdefault(name, Stat()).add(float(value))
+
+    def endFrame(self):
+        """Close a frame, rolling over to a new interval when one is due."""
+        self.frames = self.frames + 1
+
+        now = time.perf_counter()
+        if now - self.intervalStart >= self.interval:
+            self.last = self.summarize(now)
+            self.write(self.last)
+
+            self.intervalStart = now
+            self.frames = 0
+            self.phases = {}
+            self.metrics = {}
+            self.overlay = None
+
+    def summarize(self, now):
+        def stats(group, scale, digits):
+            return dict((name, {"count": stat.count, "mean": round(stat.getMean() * scale, digits),
+                "max": round(stat.max * scale, digits), "total": round(stat.total * scale, digits)}) for name, stat in group.items())
+
+        return {
+            "t": round(now - self.start, 3),
+            "seconds": round(now - self.intervalStart, 3),
+            "frames": self.frames,
+            "phases_ms": stats(self.phases, 1000, 4),
+            "metrics": stats(self.metrics, 1, 2),
+        }
+
+    def write(self, summary):
+        if not self.outFile:
+            return
+
+        if self.writer:
+            self.writer.writerow([summary["t"], "interval", "frames", summary["frames"], "", "", summary["seconds"]])
+            for kind, key in (("phase_ms", "phases_ms"), ("metric", "metrics")):
+                for name, stat in summary[key].items():
+                    self.writer.writerow([summary["t"], kind, name, stat["count"], stat["mean"], stat["max"], stat["total"]])
+        else:
+            self.outFile.write(json.dumps(summary) + "\n")
+        self.outFile.flush()
+
+    def toggle(self):
+        self.shown = not self.shown
+        self.overlay = None
+        self.overlayHeight = 0
+
+    def isShown(self):
+        return self.shown
+
+    def getLines(self):
+        if not self.last:
+            return ["profiling..."]
+
+        lines = ["%d frames in %.2fs" % (self.last["frames"], self.last["seconds"])]
+        for name, stat in self.last["phases_ms"].items():
+            lines.append("%-12s %8.3f %8.3f ms" % (name, stat["mean"], stat["max"]))
+        for name, stat in self.last["metrics"].items():
+            lines.append("%-12s %8.1f %8.1f" % (name, stat["mean"], stat["max"]))
+
+        return lines
+
+    def draw(self, screen):
+        """Draw the overlay in the top left corner if it is shown.
+
+        Returns the list of screen rects that were touched.
+        """
+        if not self.shown:
+            return []
+
+        if not self.overlay:
+            font = fonts.getFont(*OVERLAY_FONT)
+            lines = self.getLines()
+
+            # Never shrink while shown, so no stale lines are left below
+            self.overlayHeight = max(self.overlayHeight, len(lines) * font.get_linesize() + 4)
+            self.overlay = pygame.Surface((OVERLAY_WIDTH, self.overlayHeight))
+            for i, line in enumerate(lines):
+                self.overlay.blit(font.render(line, True, (255, 255, 255)), (2, 2 + i * font.get_linesize()))
+
+        return [screen.blit(self.overlay, (0, 0))]
+
+    def close(self):
+        if self.outFile:
+            self.write(self.summarize(time.perf_counter()))
+            self.outFile.close()
+            self.outFile = None
+
+def timed(p, name):
+    """p.phase(name), or a no-op when there is no profiler."""
+    return p.phase(name) if p else contextlib.nullcontext()
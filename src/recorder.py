@@ -0,0 +1,150 @@
+###########################################################
+# Filename: recorder.py
+# Last Modified: 10/18/2026
+#
+# Session recording and replay. A recording is one JSON
+# object per line: a "game" line with the seed (or the
+# packed mine layout) each time a board is filled, then
+# one line per uncover or flag with its time and how many
+# tiles it changed. Batches of moves are logged as one line
+# and undo or redo as a rewind to a move number
+#
+
+import base64, json, time
+import numpy
+import chunks, engine
+
+VERSION = 1
+
+class Recorder():
+    def __init__(self, path):
+        self.outFile = open(path, "w", buffering=1)
+        self.start = time.perf_counter()
+        self.write({"type": "session", "version": VERSION})
+
+    def write(self, entry):
+        entry["t"] = round(time.perf_counter() - self.start, 6)
+        self.outFile.write(json.dumps(entry) + "\n")
+
+    def recordGame(self, e, startPos):
+        """Log a newly filled board. Boards that weren't generated from a
+        seed, like no-guess pool boards, are logged as their mine bitmap;
+        pool boards come from unseeded worker processes, so they can't
+        follow the session seed."""
+        entry = {
+            "type": "game",
+            "engine": "chunked" if isinstance(e, chunks.ChunkedEngine) else "dense",
+            "size": list(e.getBounds()),
+            "mineCount": int(e.mineCount),
+            "start": [int(startPos[0]), int(startPos[1])],
+            "seed": e.seed,
+        }
+        if getattr(e, "pregenerated", False):
+            entry["pregenerated"] = True
+        if e.seed is None:
+            entry["mines"] = base64.b64encode(numpy.packbits(e.mines).tobytes()).decode("ascii")
+
+        self.write(entry)
+
+    def recordAction(self, action, x, y, changed):
+        """Log a single move on the tile at (x, y), or for "activate" a
+        parked flood resumed on the chunk at (x, y)."""
+        self.write({"type": action, "x": int(x), "y": int(y), "changed": int(len(changed))})
+
+    def recordBatch(self, actions, changed):
+        self.write({"type": "batch", "actions": [[action, int(x), int(y)] for action, x, y in actions], "changed": int(len(changed))})
+
+    def recordRewind(self, move, changed):
+        self.write({"type": "rewind", "move": int(move), "changed": int(len(changed))})
+
+    def close(self):
+        self.outFile.close()
+
+class Game():
+    def __init__(self, entry):
+        self.entry = entry
+        self.actions = []
+
+    def createEngine(self):
+        """A fresh engine filled exactly as the recorded one was."""
+        w, h = self.entry["size"]
+        startPos = tuple(self.entry["start"])
+
+        if self.entry["engine"] == "chunked":
+            e = chunks.ChunkedEngine(w, h)
+            e.fill(startPos, self.entry["mineCount"], self.entry["seed"])
+        elif self.entry["seed"] is None:
+            e = engine.Engine(w, h)
+            packed = numpy.frombuffer(base64.b64decode(self.entry["mines"]), dtype=numpy.uint8)
+            e.load(numpy.unpackbits(packed, count=w * h).view(numpy.bool_).reshape(w, h))
+        elif self.entry.get("pregenerated"):
+            e = engine.Engine(w, h)
+            layout = engine.placeLayout((w, h), self.entry["mineCount"], self.entry["seed"])
+            e.fill(startPos, self.entry["mineCount"], self.entry["seed"], layout)
+        else:
+            e = engine.Engine(w, h)
+            e.fill(startPos, self.entry["mineCount"], self.entry["seed"])
+
+        return e
+
+def read(path):
+    """The games of a recording, each with its list of actions."""
+    games = []
+    with open(path, "r") as inFile:
+        for line in inFile:
+            entry = json.loads(line)
+            if entry["type"] == "session" and entry["version"] != VERSION:
+                raise ValueError("%s has unsupported recording version %d" % (path, entry["version"]))
+            elif entry["type"] == "game":
+                games.append(Game(entry))
+            elif entry["type"] in ("uncover", "flag", "activate", "batch", "rewind") and games:
+                games[-1].actions.append(entry)
+
+    return games
+
+class Replayer():
+    """Plays a recording back against a bare engine.
+
+    With a speed of 0 actions run back to back; otherwise the recorded
+    gaps between them are kept, scaled down by speed, so 1 is real time.
+    """
+    def __init__(self, path, speed=0):
+        self.games = read(path)
+        self.speed = speed
+
+    def run(self, listener=None):
+        """Replay every game, calling listener(action, changed, seconds)
+        after each action. Returns the number of actions whose changed
+        tile count differs from the recording."""
+        mismatches = 0
+        start = time.perf_counter()
+        origin = self.games[0].entry["t"] if self.games else 0
+
+        for game in self.games:
+            self.wait(start, game.entry["t"] - origin)
+            e = game.createEngine()
+
+            for action in game.actions:
+                self.wait(start, action["t"] - origin)
+
+                t = time.perf_counter()
+                if action["type"] == "batch":
+                    changed = e.apply(action["actions"])
+                elif action["type"] == "rewind":
+                    changed = e.rewind(action["move"])
+                else:
+                    changed = getattr(e, action["type"])(action["x"], action["y"])
+                seconds = time.perf_counter() - t
+
+                if len(changed) != action["changed"]:
+                    mismatches = mismatches + 1
+                if listener:
+                    listener(action, changed, seconds)
+
+        return mismatches
+
+    def wait(self, start, t):
+        if self.speed > 0:
+            delay = start + t / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
@@ -0,0 +1,64 @@
+###########################################################
+# Filename: replay.py
+# Last Modified: 10/18/2026
+#
+# headless replay of a session recorded with
+#   python src/main.py --record session.ndjson
+# Runs as fast as possible by default, or at the recorded
+# pace with --speed 1, and reports per-action latency as
+# JSON, e.g.
+#   python src/replay.py session.ndjson
+#
+
+import argparse, json, platform, time
+import recorder, simulate
+
+def replay(path, speed):
+    replayer = recorder.Replayer(path, speed)
+    timings = {"uncover": [], "flag": [], "batch": [], "rewind": []}
+    sizes = []
+
+    def listener(action, changed, seconds):
+        timings[action["type"]].append(seconds)
+        if action["type"] == "uncover":
+            sizes.append(len(changed))
+
+    start = time.perf_counter()
+    mismatches = replayer.run(listener)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "commit": simulate.getCommit(),
+        "python": platform.python_version(),
+        "recording": path,
+        "speed": speed,
+        "games": len(replayer.games),
+        "actions": sum(len(game.actions) for game in replayer.games),
+        "mismatches": mismatches,
+        "seconds": round(elapsed, 4),
+        "largest_uncover": max(sizes, default=0),
+        "latency": dict((name, simulate.summarize(times)) for name, times in timings.items()),
+        "peak_memory_bytes": simulate.getPeakMemory(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Minesweepyr session headless")
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=0, help="1 replays in real time, 2 twice as fast; 0 (default) as fast as possible")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = replay(args.recording, args.speed)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as outFile:
+            outFile.write(text + "\n")
+    else:
+        print(text)
+
+    # A mismatch means the recording no longer reproduces on this tree
+    raise SystemExit(1 if report["mismatches"] else 0)
+
+if __name__ == "__main__":
+    main()
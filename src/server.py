@@ -0,0 +1,288 @@
+###########################################################
+# Filename: server.py
+# Last Modified: 10/18/2026
+#
+# headless multi-game server. Hosts many engines in one
+# asyncio process behind a line protocol over TCP or a
+# Unix socket, e.g.
+#   python src/server.py --port 7878
+#   python src/server.py --unix /tmp/minesweepyr.sock
+#
+# Every request is one line and gets one line back, either
+# "OK ..." or "ERR <reason>":
+#   NEW <w> <h> <mines> [seed]   -> OK <id>
+#   REVEAL|FLAG|UNFLAG|CHORD <id> <x> <y>
+#                                -> OK <state> <n> <i>:<look> ...
+#   BATCH <id> <action> <x> <y> [<action> <x> <y> ...]
+#                                -> OK <state> <n> <i>:<look> ...
+#   STATE <id>                   -> OK <state> <w> <h> <flagsLeft> <looks>
+#   CLOSE <id>                   -> OK
+#   STATS                        -> OK <json>
+# state is new, playing, won or lost; looks are the
+# Engine.getLooks bytes of every tile, base64 encoded
+#
+
+import argparse, asyncio, base64, collections, json, os, time
+import numpy
+import engine
+
+DEFAULT_PORT = 7878
+
+# Boards past this many tiles are refused
+MAX_TILES = 1 << 20
+
+# Games untouched this long are evicted, checked every EVICT_INTERVAL
+IDLE_TIMEOUT = 300.0
+EVICT_INTERVAL = 10.0
+
+# The least recently used games are evicted to stay under this
+MAX_MEMORY = 512 * 1024 * 1024
+
+# Bytes read from a connection at a time
+READ_SIZE = 64 * 1024
+
+# Pending reply bytes past which a connection waits for its client
+WRITE_BUFFER_LIMIT = 64 * 1024
+
+ACTIONS = {
+    "REVEAL": "reveal",
+    "FLAG": "flag",
+    "UNFLAG": "unflag",
+    "CHORD": "chord",
+}
+
+class ProtocolError(Exception):
+    pass
+
+class Session():
+    def __init__(self, w, h, mineCount, seed):
+        # The protocol has no undo, so the engine keeps no history
+        self.engine = engine.Engine(w, h, seed, historySize=0)
+        self.mineCount = mineCount
+        self.touched = time.monotonic()
+        self.memory = 0
+
+    def getState(self):
+        return self.engine.getState()
+
+    def apply(self, actions):
+        """Apply moves, filling the board around the first reveal."""
+        e = self.engine
+        if not e.filled:
+            for action, x, y in actions:
+                if action == "reveal":
+                    e.fill((x, y), self.mineCount)
+                    break
+            else:
+                return engine.NO_CHANGE
+
+        return e.apply(actions)
+
+    def getMemory(self):
+        """Bytes held by the engine's arrays and history."""
+        e = self.engine
+        arrays = [e.mines, e.counts, e.revealed, e.flagged, e.mineIndex]
+        if e.regions is not None:
+            arrays.extend((e.regions, e.regionOffsets, e.regionCells))
+
+        return sum(a.nbytes for a in arrays) + e.history.bytes
+
+class Server():
+    def __init__(self, idleTimeout=IDLE_TIMEOUT, maxMemory=MAX_MEMORY):
+        self.idleTimeout = idleTimeout
+        self.maxMemory = maxMemory
+
+        # Least recently used first
+        self.sessions = collections.OrderedDict()
+        self.nextId = 1
+        self.memory = 0
+
+        self.connections = 0
+        self.moves = 0
+        self.evicted = 0
+        self.started = time.monotonic()
+
+    def getSession(self, gameId):
+        try:
+            session = self.sessions[int(gameId)]
+        except (KeyError, ValueError):
+            raise ProtocolError("no game %s" % gameId)
+
+        session.touched = time.monotonic()
+        self.sessions.move_to_end(int(gameId))
+        return session
+
+    def account(self, session):
+        memory = session.getMemory()
+        self.memory = self.memory + memory - session.memory
+        session.memory = memory
+
+    def create(self, w, h, mineCount, seed=None):
+        if w < 1 or h < 1 or w * h > MAX_TILES:
+            raise ProtocolError("bad size %dx%d" % (w, h))
+        if mineCount < 0 or mineCount > w * h - 9:
+            raise ProtocolError("bad mine count %d" % mineCount)
+
+        session = Session(w, h, mineCount, seed)
+        gameId = self.nextId
+        self.nextId = self.nextId + 1
+        self.sessions[gameId] = session
+        self.account(session)
+        self.evict()
+
+        return gameId
+
+    def close(self, gameId):
+        self.getSession(gameId)
+        self.memory = self.memory - self.sessions.pop(int(gameId)).memory
+
+    def evict(self, now=None):
+        """Drop idle games, then the least recently used ones until the
+        server is back under its memory limit."""
+        now = now if now is not None else time.monotonic()
+        while self.sessions:
+            gameId, session = next(iter(self.sessions.items()))
+            if now - session.touched < self.idleTimeout and self.memory <= self.maxMemory:
+                break
+
+            del self.sessions[gameId]
+            self.memory = self.memory - session.memory
+            self.evicted = self.evicted + 1
+
+    def handle(self, line):
+        """Answer one request line."""
+        words = line.split()
+        if not words:
+            raise ProtocolError("empty request")
+
+        command = words[0].upper()
+        try:
+            if command == "NEW" and len(words) in (4, 5):
+                seed = int(words[4]) if len(words) == 5 else None
+                return "OK %d" % self.create(int(words[1]), int(words[2]), int(words[3]), seed)
+
+            if command in ACTIONS and len(words) == 4:
+                return self.move(words[1], [(ACTIONS[command], int(words[2]), int(words[3]))])
+
+            if command == "BATCH" and len(words) >= 5 and (len(words) - 2) % 3 == 0:
+                actions = []
+                for n in range(2, len(words), 3):
+                    if words[n].upper() not in ACTIONS:
+                        raise ProtocolError("unknown action %s" % words[n])
+                    actions.append((ACTIONS[words[n].upper()], int(words[n + 1]), int(words[n + 2])))
+                return self.move(words[1], actions)
+
+            if command == "STATE" and len(words) == 2:
+                session = self.getSession(words[1])
+                e = session.engine
+                looks = e.getLooks(numpy.arange(e.totalTiles))
+                return "OK %s %d %d %d %s" % (session.getState(), e.w, e.h, e.getFlagsLeft(), base64.b64encode(looks.tobytes()).decode("ascii"))
+
+            if command == "CLOSE" and len(words) == 2:
+                self.close(words[1])
+                return "OK"
+
+            if command == "STATS" and len(words) == 1:
+                return "OK " + json.dumps(self.getStats())
+        except ValueError:
+            raise ProtocolError("bad number in %s" % command)
+
+        raise ProtocolError("bad request %s" % command)
+
+    def move(self, gameId, actions):
+        session = self.getSession(gameId)
+        e = session.engine
+        for action, x, y in actions:
+            if not (0 <= x < e.w and 0 <= y < e.h):
+                raise ProtocolError("%d,%d is off the board" % (x, y))
+
+        changed = session.apply(actions)
+        self.moves = self.moves + len(actions)
+
+        # Filling labels the openings and every move may grow the history
+        self.account(session)
+        self.evict()
+
+        looks = e.getLooks(changed)
+        diff = " ".join("%d:%d" % pair for pair in zip(changed.tolist(), looks.tolist()))
+        return "OK %s %d %s" % (session.getState(), len(changed), diff)
+
+    def getStats(self):
+        uptime = time.monotonic() - self.started
+        return {
+            "games": len(self.sessions),
+            "connections": self.connections,
+            "memory_bytes": self.memory,
+            "moves": self.moves,
+            "moves_per_second": round(self.moves / uptime, 1) if uptime else 0.0,
+            "evicted": self.evicted,
+        }
+
+    async def serve(self, reader, writer):
+        self.connections = self.connections + 1
+        pending = b""
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+
+                # Answer every complete line that arrived in one write, so
+                # pipelined requests cost one send instead of one each
+                lines = (pending + data).split(b"\n")
+                pending = lines.pop()
+                replies = []
+                for line in lines:
+                    try:
+                        replies.append(self.handle(line.decode("ascii", "replace")))
+                    except ProtocolError as e:
+                        replies.append("ERR %s" % e)
+                if replies:
+                    writer.write(("\n".join(replies) + "\n").encode("ascii"))
+
+                if writer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections = self.connections - 1
+            writer.close()
+
+    async def evictLoop(self):
+        while True:
+            await asyncio.sleep(EVICT_INTERVAL)
+            self.evict()
+
+async def run(args):
+    server = Server(args.idle_timeout, args.max_memory)
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.remove(args.unix)
+        listener = await asyncio.start_unix_server(server.serve, args.unix)
+    else:
+        listener = await asyncio.start_server(server.serve, args.host, args.port)
+
+    print("serving on %s" % (args.unix or "%s:%d" % (args.host, args.port)), flush=True)
+    evictor = asyncio.ensure_future(server.evictLoop())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        evictor.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve many headless Minesweepyr games over a line protocol")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help="seconds before an untouched game is evicted")
+    parser.add_argument("--max-memory", type=int, default=MAX_MEMORY, help="bytes of game state kept before the least recently used games are evicted")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+###########################################################
+# Filename: simulate.py
+# Last Modified: 10/18/2026
+#
+# headless batch simulator. Plays N games without a
+# window and reports throughput, per-action latency and
+# peak memory as JSON, e.g.
+#   python src/simulate.py --games 500 --size 24x24 --difficulty HARD
+#
+
+import argparse, json, os, platform, subprocess, sys, time
+import numpy
+import config, engine, solver
+
+class RandomPlayer():
+    """Uncovers random covered tiles, flagging one now and then."""
+    def __init__(self, target, rng):
+        self.target = target
+        self.rng = rng
+
+    def observe(self, changed):
+        return
+
+    def move(self):
+        e = self.target.getEngine()
+        covered = numpy.flatnonzero(~e.revealed & ~e.flagged)
+        x, y = e.getPos(covered[self.rng.integers(len(covered))])
+
+        if self.rng.random() < 0.1:
+            return ("flag", x, y)
+        return ("uncover", x, y)
+
+class SolverPlayer():
+    """Flags certain mines, uncovers certain safe tiles and otherwise takes
+    the tile least likely to be a mine."""
+    def __init__(self, target, rng):
+        # Fed by hand after each timed action so its own work isn't
+        # counted as engine latency
+        self.solver = solver.Solver(target.getEngine())
+        self.solver.detach()
+
+    def observe(self, changed):
+        self.solver.update(changed)
+
+    def move(self):
+        mines = self.solver.getMines()
+        if mines:
+            return ("flag",) + self.solver.engine.getPos(min(mines))
+
+        return ("uncover",) + self.solver.getHint()
+
+    def moves(self):
+        """Every move the solver is sure of as one batch for apply."""
+        e = self.solver.engine
+        actions = [("flag",) + e.getPos(i) for i in sorted(self.solver.getMines())]
+        actions.extend(("reveal",) + e.getPos(i) for i in sorted(self.solver.getSafe()))
+        if not actions:
+            actions.append(("reveal",) + self.solver.getHint())
+
+        return ("apply", actions)
+
+PLAYERS = {
+    "random": RandomPlayer,
+    "solver": SolverPlayer,
+}
+
+class EngineTarget():
+    def __init__(self, w, h, modifier, topology="grid", seed=None):
+        self.engine = engine.Engine(w, h, seed, topology=topology, historySize=0)
+        self.mineCount = int(w * h * modifier)
+
+    def fill(self, startPos):
+        self.engine.fill(startPos, self.mineCount)
+
+    def uncover(self, x, y):
+        return self.engine.uncover(x, y)
+
+    def flag(self, x, y):
+        return self.engine.flag(x, y)
+
+    def apply(self, actions):
+        return self.engine.apply(actions)
+
+    def getEngine(self):
+        return self.engine
+
+class BoardTarget():
+    """Drives a full board.Board, sprites included, on a dummy display."""
+    def __init__(self, w, h, modifier, topology="grid", seed=None):
+        if topology != "grid":
+            raise SystemExit("boards are only drawn as grids")
+
+        # The report goes to stdout, so pygame must not greet us there
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        import pygame, board, game
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+
+        size = (w * config.TILE_SIZE, h * config.TILE_SIZE)
+        self.board = board.Board(config.TILE_SIZE, size, size, game.Difficulty("SIM", modifier), game.Theme(), seed=seed)
+
+    def fill(self, startPos):
+        self.board.fillBoard(startPos)
+
+    def uncover(self, x, y):
+        return self.board.uncover(x, y)
+
+    def flag(self, x, y):
+        return self.board.flipFlagged(x, y)
+
+    def apply(self, actions):
+        return self.board.apply(actions)
+
+    def getEngine(self):
+        return self.board.getEngine()
+
+TARGETS = {
+    "engine": EngineTarget,
+    "board": BoardTarget,
+}
+
+def getCommit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def getPeakMemory():
+    """Peak resident set size of this process in bytes, where available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def summarize(times):
+    if not times:
+        return {"count": 0}
+
+    times = numpy.array(times) * 1000
+    return {
+        "count": len(times),
+        "p50_ms": round(float(numpy.percentile(times, 50)), 4),
+        "p99_ms": round(float(numpy.percentile(times, 99)), 4),
+        "max_ms": round(float(times.max()), 4),
+    }
+
+def simulate(games, w, h, modifier, player, target, seed, batch=False, topology="grid"):
+    rng = numpy.random.default_rng(seed)
+    # Seeded before the board lays out anything, like the next board
+    board = TARGETS[target](w, h, modifier, topology, int(rng.integers(2**63)))
+    bot = PLAYERS[player](board, rng)
+    nextMove = bot.moves if batch and hasattr(bot, "moves") else bot.move
+
+    timings = {"fill": [], "uncover": [], "flag": [], "apply": []}
+    wins = 0
+    moves = 0
+
+    start = time.perf_counter()
+    for game in range(games):
+        startPos = (int(rng.integers(w)), int(rng.integers(h)))
+
+        t = time.perf_counter()
+        board.fill(startPos)
+        timings["fill"].append(time.perf_counter() - t)
+        bot.observe(None)
+
+        action = ("uncover",) + startPos
+        while True:
+            t = time.perf_counter()
+            changed = getattr(board, action[0])(*action[1:])
+            timings[action[0]].append(time.perf_counter() - t)
+            bot.observe(changed)
+            moves = moves + 1
+
+            if not board.getEngine().isPlayable():
+                break
+            action = nextMove()
+
+        wins = wins + board.getEngine().hasWon()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "commit": getCommit(),
+        "python": platform.python_version(),
+        "target": target,
+        "topology": topology,
+        "player": player,
+        "size": [w, h],
+        "modifier": modifier,
+        "seed": seed,
+        "batch": batch,
+        "games": games,
+        "wins": int(wins),
+        "moves": moves,
+        "seconds": round(elapsed, 4),
+        "games_per_second": round(games / elapsed, 2),
+        "latency": dict((name, summarize(times)) for name, times in timings.items()),
+        "peak_memory_bytes": getPeakMemory(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Minesweepyr games headless and report performance")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--size", default="24x24", help="board size in tiles, WxH")
+    parser.add_argument("--difficulty", default="MEDIUM", help="difficulty name from settings.json or a mine density")
+    parser.add_argument("--player", choices=sorted(PLAYERS.keys()), default="solver")
+    parser.add_argument("--target", choices=sorted(TARGETS.keys()), default="engine", help="drive the bare engine or a full board with sprites")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch", action="store_true", help="let the solver play every move it is sure of in one apply call")
+    parser.add_argument("--topology", choices=sorted(engine.TOPOLOGIES.keys()), default="grid", help="which tiles neighbor each other")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    w, h = (int(n) for n in args.size.lower().split("x"))
+    report = simulate(args.games, w, h, config.loadDifficulty(args.difficulty), args.player, args.target, args.seed, args.batch, args.topology)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as outFile:
+            outFile.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+###########################################################
+# Filename: solver.py
+# Last Modified: 10/18/2026
+#
+# Reasons about the visible state of an engine: which
+# covered tiles are certainly safe, which are certainly
+# mines, and how likely the rest are to be mines
+#
+
+import numpy
+from collections import deque
+
+# Frontier components with more unknowns than this are not enumerated
+# exactly; their tiles get the average of their constraints instead
+MAX_ENUMERATION = 24
+
+class Component():
+    def __init__(self, cells, unknowns):
+        self.cells = cells
+        self.unknowns = unknowns
+        self.expectedMines = 0.0
+
+class Solver():
+    """Incremental minesweeper solver.
+
+    Every revealed number is a constraint on its covered neighbors. Flags
+    are trusted as mines. Constraints are simplified with the single cell
+    and subset rules, then every independent group of frontier tiles is
+    enumerated exactly to find the tiles that are forced either way and
+    the mine probability of the rest.
+
+    The solver listens to its engine and only revisits the constraints
+    around tiles that changed, so each move costs time proportional to
+    the part of the frontier it touched.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.engine.addListener(self.update)
+
+        self.reset()
+
+    def reset(self):
+        self.constraints = {}
+        self.unknownConstraints = {}
+        self.components = {}
+        self.cellComponents = {}
+
+        self.safe = set()
+        self.mines = set()
+        self.probabilities = {}
+        self.moves = self.engine.getMoveCount()
+
+        if self.engine.filled:
+            self.update(numpy.flatnonzero(self.engine.revealed | self.engine.flagged))
+
+    def detach(self):
+        self.engine.removeListener(self.update)
+
+    def update(self, changed):
+        """Fold the tiles in changed into the constraint set and re-solve
+        the parts of the frontier they touch. A changed of None means the
+        whole board was replaced."""
+        revealed = self.engine.revealed.ravel()
+        flagged = self.engine.flagged.ravel()
+
+        # Tiles covered again by an undo can't be folded in, and a flag
+        # taken off may be what constraints were dropped or tiles marked
+        # on, so start over
+        if changed is None or self.engine.getMoveCount() < self.moves or (~revealed[changed] & ~flagged[changed]).any():
+            self.reset()
+            return
+        self.moves = self.engine.getMoveCount()
+        if self.engine.hasLost():
+            return
+
+        dirty = set()
+        for i in changed:
+            i = int(i)
+            if revealed[i]:
+                self.safe.discard(i)
+                self.removeUnknown(i, 0, dirty)
+                self.addConstraint(i, dirty)
+            elif i in self.mines:
+                self.mines.discard(i)
+            else:
+                self.removeUnknown(i, 1, dirty)
+
+        self.solve(dirty)
+
+    def addConstraint(self, i, dirty):
+        if self.engine.counts.flat[i] == 0:
+            return
+
+        flagged = self.engine.flagged.ravel()
+        revealed = self.engine.revealed.ravel()
+
+        unknowns = set()
+        value = int(self.engine.counts.flat[i])
+        for n in self.engine.getNeighbors(i):
+            if flagged[n] or n in self.mines:
+                value = value - 1
+            elif not revealed[n] and n not in self.safe:
+                unknowns.add(n)
+                self.unknownConstraints.setdefault(n, set()).add(i)
+
+        self.constraints[i] = [unknowns, value]
+        dirty.add(i)
+
+    def removeUnknown(self, i, mine, dirty):
+        for c in self.unknownConstraints.pop(i, ()):
+            self.constraints[c][0].discard(i)
+            self.constraints[c][1] = self.constraints[c][1] - mine
+            dirty.add(c)
+
+        self.probabilities.pop(i, None)
+
+    def markSafe(self, i, dirty):
+        if i not in self.safe:
+            self.safe.add(i)
+            self.removeUnknown(i, 0, dirty)
+
+    def markMine(self, i, dirty):
+        if i not in self.mines:
+            self.mines.add(i)
+            self.removeUnknown(i, 1, dirty)
+
+    def propagate(self, work):
+        """Apply the single cell and subset rules until nothing new follows.
+
+        Returns every constraint that was looked at.
+        """
+        touched = set(work)
+        work = deque(work)
+
+        while work:
+            c = work.popleft()
+            if c not in self.constraints:
+                continue
+
+            unknowns, value = self.constraints[c]
+            if not unknowns:
+                del self.constraints[c]
+                continue
+
+            found = set()
+            if value == 0:
+                for i in list(unknowns):
+                    self.markSafe(i, found)
+            elif value == len(unknowns):
+                for i in list(unknowns):
+                    self.markMine(i, found)
+            else:
+                for d in set().union(*(self.unknownConstraints[i] for i in unknowns)):
+                    if d == c:
+                        continue
+
+                    other, otherValue = self.constraints[d]
+                    if unknowns < other:
+                        rest = other - unknowns
+                        if otherValue == value:
+                            for i in rest:
+                                self.markSafe(i, found)
+                        elif otherValue - value == len(rest):
+                            for i in rest:
+                                self.markMine(i, found)
+
+                    if found:
+                        found.add(c)
+                        break
+
+            touched.update(found)
+            work.extend(found)
+
+        return touched
+
+    def solve(self, dirty):
+        while dirty:
+            touched = self.propagate(dirty)
+
+            dirty = set()
+            seen = set()
+            for c in touched:
+                if c in self.constraints and c not in seen:
+                    component = self.collectComponent(c)
+                    seen.update(component.cells)
+                    self.enumerate(component, dirty)
+
+            # Components that lost every constraint leave nothing to solve
+            for c in touched:
+                if c not in self.constraints and c in self.cellComponents:
+                    self.dropComponent(self.cellComponents[c])
+
+    def collectComponent(self, start):
+        cells = set([start])
+        unknowns = set()
+        work = deque([start])
+
+        while work:
+            c = work.popleft()
+            for i in self.constraints[c][0]:
+                if i not in unknowns:
+                    unknowns.add(i)
+                    for d in self.unknownConstraints[i]:
+                        if d not in cells:
+                            cells.add(d)
+                            work.append(d)
+
+        for c in cells:
+            if c in self.cellComponents:
+                self.dropComponent(self.cellComponents[c])
+
+        component = Component(cells, sorted(unknowns))
+        key = min(cells)
+        self.components[key] = component
+        for c in cells:
+            self.cellComponents[c] = key
+
+        return component
+
+    def dropComponent(self, key):
+        component = self.components.pop(key, None)
+        if component:
+            for c in component.cells:
+                if self.cellComponents.get(c) == key:
+                    del self.cellComponents[c]
+
+    def enumerate(self, component, dirty):
+        """Enumerate the mine layouts of one frontier component.
+
+        Layouts are weighted by the odds of a mine in the rest of the board,
+        so layouts with more mines count for more on dense boards. Tiles
+        that are a mine in every layout or in none are marked and their
+        constraints queued on dirty.
+        """
+        unknowns = component.unknowns
+        cells = sorted(component.cells)
+
+        if len(unknowns) > MAX_ENUMERATION:
+            self.estimate(component)
+            return
+
+        index = dict((i, n) for n, i in enumerate(unknowns))
+        members = [[index[i] for i in self.constraints[c][0]] for c in cells]
+        values = [self.constraints[c][1] for c in cells]
+        watching = [[] for i in unknowns]
+        for n, member in enumerate(members):
+            for i in member:
+                watching[i].append(n)
+
+        density = self.getBackgroundDensity()
+        odds = density / (1 - density) if 0 < density < 1 else 1.0
+
+        assigned = [0] * len(cells)
+        unassigned = [len(member) for member in members]
+        layout = [0] * len(unknowns)
+        mineWeight = [0.0] * len(unknowns)
+        totals = [0.0, 0.0]
+
+        def place(n, mines):
+            if n == len(unknowns):
+                weight = odds ** mines
+                totals[0] = totals[0] + weight
+                totals[1] = totals[1] + weight * mines
+                for i in range(len(unknowns)):
+                    if layout[i]:
+                        mineWeight[i] = mineWeight[i] + weight
+                return
+
+            for mine in (0, 1):
+                ok = True
+                for c in watching[n]:
+                    if assigned[c] + mine > values[c] or assigned[c] + mine + unassigned[c] - 1 < values[c]:
+                        ok = False
+                        break
+                if not ok:
+                    continue
+
+                layout[n] = mine
+                for c in watching[n]:
+                    assigned[c] = assigned[c] + mine
+                    unassigned[c] = unassigned[c] - 1
+
+                place(n + 1, mines + mine)
+
+                for c in watching[n]:
+                    assigned[c] = assigned[c] - mine
+                    unassigned[c] = unassigned[c] + 1
+            layout[n] = 0
+
+        place(0, 0)
+
+        # No layout fits, so a flag is wrong; there is nothing to conclude
+        if totals[0] == 0:
+            for i in unknowns:
+                self.probabilities.pop(i, None)
+            return
+
+        component.expectedMines = totals[1] / totals[0]
+        for n, i in enumerate(unknowns):
+            p = mineWeight[n] / totals[0]
+            if p == 0:
+                self.markSafe(i, dirty)
+            elif p == 1:
+                self.markMine(i, dirty)
+            else:
+                self.probabilities[i] = p
+
+    def estimate(self, component):
+        share = {}
+        for c in component.cells:
+            unknowns, value = self.constraints[c]
+            for i in unknowns:
+                share.setdefault(i, []).append(value / len(unknowns))
+
+        component.expectedMines = 0.0
+        for i, shares in share.items():
+            self.probabilities[i] = sum(shares) / len(shares)
+            component.expectedMines = component.expectedMines + self.probabilities[i]
+
+    def getRemainingMines(self):
+        return self.engine.mineCount - self.engine.getFlagCount() - len(self.mines)
+
+    def getBackgroundDensity(self):
+        """Mine density of covered tiles that touch no revealed number."""
+        frontier = len(self.unknownConstraints)
+        expected = sum(component.expectedMines for component in self.components.values())
+        covered = self.engine.totalTiles - self.engine.countUncoveredTiles - self.engine.getFlagCount() - len(self.mines) - len(self.safe)
+        rest = covered - frontier
+        if rest <= 0:
+            return 0.0
+
+        return min(max((self.getRemainingMines() - expected) / rest, 0.0), 1.0)
+
+    def getSafe(self):
+        """Covered tiles (flat indices) that cannot be mines."""
+        return set(self.safe)
+
+    def getMines(self):
+        """Unflagged tiles (flat indices) that must be mines."""
+        return set(self.mines)
+
+    def getProbability(self, x, y):
+        i = x * self.engine.h + y
+        if self.engine.revealed.flat[i] or i in self.safe:
+            return 0.0
+        if self.engine.flagged.flat[i] or i in self.mines:
+            return 1.0
+
+        return self.probabilities.get(i, self.getBackgroundDensity())
+
+    def getProbabilities(self):
+        """Mine probability of every tile as a (w, h) array."""
+        probabilities = numpy.full(self.engine.totalTiles, self.getBackgroundDensity())
+        probabilities[self.engine.revealed.ravel()] = 0.0
+        probabilities[self.engine.flagged.ravel()] = 1.0
+        for i, p in self.probabilities.items():
+            probabilities[i] = p
+        probabilities[list(self.safe)] = 0.0
+        probabilities[list(self.mines)] = 1.0
+
+        return probabilities.reshape(self.engine.w, self.engine.h)
+
+    def getHint(self):
+        """The best tile to uncover next as (x, y): a certainly safe one if
+        there is any, otherwise the least likely to be a mine."""
+        if self.safe:
+            return self.engine.getPos(min(self.safe))
+
+        probabilities = self.getProbabilities()
+        probabilities[self.engine.revealed | self.engine.flagged] = 2.0
+        return self.engine.getPos(numpy.argmin(probabilities))
@@ -1,28 +1,22 @@
 ###########################################################
 # Filename: tiles.py
 # Author: Shaun Rasmusen <shaunrasmusen@gmail.com>
-# Last Modified: 12/31/2020
+# Last Modified: 10/18/2026
 #
 # tile classes for numbers and mines
 #
 
 import pygame
-import colors
+import atlas
 
-pygame.font.init()
-
-MINE = 9
+MINE = atlas.MINE
 
 class Tile(pygame.sprite.Sprite):
     def __init__(self, value, pos, theme, size = 16):
         pygame.sprite.Sprite.__init__(self)
 
-        self.borderScale = .95
-        self.image = pygame.Surface((size, size))
-        self.tile = pygame.Surface((size * self.borderScale, size * self.borderScale))
-
         self.size = size
-        self.theme = theme
+        self.setTheme(theme)
         
         self.uncovered = False
         self.flagged = False
@@ -33,21 +27,7 @@ class Tile(pygame.sprite.Sprite):
         self.redraw()
 
     def redraw(self):
-        return
-
-    def draw(self, value, color):
-        number = self.theme.tileFont.render(str(value), True, (255-color[0],255-color[1],255-color[2]))
-
-        numMidwide = (self.size / 2) - (number.get_width() / 2)
-        numMidhigh = (self.size / 2) - (number.get_height() / 2)
-        tileMidwide = (self.size / 2) - ((self.size * self.borderScale) / 2)
-        tileMidhigh = (self.size / 2) - ((self.size * self.borderScale) / 2)
-
-        self.tile.fill(color)
-        self.image.fill((abs(color[0]-32),abs(color[1]-32),abs(color[2]-32)))
-        
-        self.image.blit(self.tile, (tileMidwide,tileMidhigh))
-        self.image.blit(number, (numMidwide,numMidhigh))
+        self.image = self.atlas.get(atlas.getLook(self.value, self.uncovered, self.flagged))
 
     def setUncovered(self, uncovered):
         if not self.flagged:
@@ -65,35 +45,24 @@ class Tile(pygame.sprite.Sprite):
     def isFlagged(self):
         return self.flagged
 
+    def setState(self, uncovered, flagged):
+        """Take on the engine's state as is, which an undo may need to put
+        back in an order the setters refuse."""
+        self.uncovered = uncovered
+        self.flagged = flagged
+        self.redraw()
+
     def getValue(self):
         return int(self.value) if self.value != 'X' else 9
 
     def setTheme(self, theme):
         self.theme = theme
+        self.atlas = atlas.getAtlas(theme, self.size)
 
 class NumberTile(Tile):
     def __init__(self, value, pos, theme, size = 16):
         super().__init__(value, pos, theme, size)
 
-    def redraw(self):
-        if self.uncovered:
-            if self.value > 0:
-                self.draw(self.value, self.theme.tileColor)
-            else:
-                self.image.fill(self.theme.tileColor)
-        elif self.flagged:
-            self.draw("F", self.theme.tileCoverColor)
-        else:
-            self.draw("", self.theme.tileCoverColor)
-
 class MineTile(Tile):
     def __init__(self, pos, theme, size = 16):
         super().__init__(MINE, pos, theme, size)
-
-    def redraw(self):
-        if self.uncovered:
-            self.draw("X", self.theme.mineColor)
-        elif self.flagged:
-            self.draw("F", self.theme.tileCoverColor)
-        else:
-            self.draw("", self.theme.tileCoverColor)
@@ -0,0 +1,30 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy
+import analyze, engine
+
+def test_batch_matches_engine():
+    rng = numpy.random.default_rng(6)
+    mines, starts = analyze.placeBatch(20, 12, 10, 25, "random", rng)
+    metrics = analyze.measureBatch(mines, starts)
+
+    for k in range(20):
+        start = tuple(starts[k].tolist())
+        assert mines[k].sum() == 25
+        assert not mines[k][engine.safeRegion(start)].any()
+
+        e = engine.Engine(12, 10)
+        e.load(mines[k])
+        labels, offsets, cells = engine.labelOpenings((e.counts == 0) & ~e.mines)
+        assert metrics["openings"][k] == len(offsets) - 1
+
+        e.uncover(*start)
+        assert metrics["first_click"][k] == e.revealed.sum()
+
+def test_summarize():
+    stats = analyze.summarize(numpy.bincount([2, 3, 3, 7]))
+    assert stats["count"] == 4 and stats["min"] == 2 and stats["max"] == 7 and stats["p50"] == 3
+    assert stats["mean"] == 3.75
+    assert analyze.summarize(numpy.zeros(5, dtype=numpy.int64)) == {"count": 0}
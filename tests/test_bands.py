@@ -0,0 +1,30 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy
+import bands, engine
+
+def test_bands_match_engine_layout(monkeypatch):
+    # Bands of 7 rows, so the start region and openings cross band edges
+    monkeypatch.setattr(bands, "BAND_TILES", 7 * 20)
+    mines, counts, (labels, offsets, cells) = bands.generate(40, 20, 120, (6, 10), seed=3, workers=2)
+
+    assert mines.sum() == 120
+    assert not mines[engine.safeRegion((6, 10))].any()
+    assert (counts == engine.countNeighbors(mines)).all()
+
+    expected = engine.labelOpenings((counts == 0) & ~mines)
+    assert (labels == expected[0]).all()
+    assert (offsets == expected[1]).all()
+    assert numpy.array_equal(cells, expected[2])
+
+def test_bands_ignore_worker_count(monkeypatch):
+    monkeypatch.setattr(bands, "BAND_TILES", 5 * 16)
+    one = bands.generate(30, 16, 60, (0, 0), seed=8, workers=1)
+    two = bands.generate(30, 16, 60, (0, 0), seed=8, workers=2)
+
+    assert (one[0] == two[0]).all()
+    assert (one[1] == two[1]).all()
+    for a, b in zip(one[2], two[2]):
+        assert numpy.array_equal(a, b)
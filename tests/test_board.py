@@ -0,0 +1,61 @@
+import os, sys, threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy
+import pygame
+import board, game
+
+def makeBoard(renderer):
+    pygame.init()
+    b = board.Board(16, (640, 480), (256, 256), game.Difficulty("EASY", .1), game.Theme(), renderer=renderer)
+    b.fillBoard((8, 8))
+    b.uncover(8, 8)
+    return b
+
+def checkSprites(b):
+    e = b.engine
+    for x in range(e.w):
+        for y in range(e.h):
+            tile = b.getTile(x, y)
+            assert (tile.isUncovered(), tile.isFlagged()) == (e.isUncovered(x, y), e.isFlagged(x, y))
+
+def test_undo_loss_restores_flag_on_mine():
+    b = makeBoard("sprite")
+    e = b.engine
+    mines = numpy.argwhere(e.mines & ~e.revealed)
+    flaggedMine = tuple(int(n) for n in mines[0])
+    hitMine = tuple(int(n) for n in mines[1])
+
+    b.flipFlagged(*flaggedMine)
+    flagsLeft = e.getFlagsLeft()
+    b.uncover(*hitMine)
+    assert e.hasLost()
+    assert e.isUncovered(*flaggedMine) and not e.isFlagged(*flaggedMine)
+
+    b.undo()
+    assert e.isPlayable()
+    assert e.isFlagged(*flaggedMine) and not e.isUncovered(*flaggedMine)
+    assert e.getFlagsLeft() == flagsLeft
+    checkSprites(b)
+
+    b.redo()
+    assert e.hasLost()
+    checkSprites(b)
+
+def test_background_fill_notifies_on_main_thread():
+    pygame.init()
+    b = board.Board(16, (640, 480), (256, 256), game.Difficulty("EASY", .1), game.Theme())
+    threads = []
+    b.engine.addListener(lambda changed: threads.append(threading.current_thread()))
+
+    b.startFill((8, 8), "uncover")
+    assert not b.isPlayable() and b.getFlagsLeft() == 0
+    b.generating.result()
+    assert all(thread is threading.main_thread() for thread in threads)
+
+    b.pollFill()
+    assert not b.isGenerating() and b.isPlayable()
+    assert b.engine.isUncovered(8, 8)
+    assert threads and all(thread is threading.main_thread() for thread in threads)
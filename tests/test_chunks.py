@@ -0,0 +1,24 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import chunks
+
+def makeEngine():
+    e = chunks.ChunkedEngine(2000, 2000)
+    e.fill((5, 5), 2000, 1)
+    return e
+
+def test_flood_does_not_depend_on_viewed_chunks():
+    played = makeEngine()
+    viewed = makeEngine()
+    for cx in range(12):
+        for cy in range(12):
+            viewed.activate(cx, cy)
+
+    assert len(played.uncover(5, 5)) == len(viewed.uncover(5, 5))
+    assert played.pending and played.pending.keys() == viewed.pending.keys()
+
+    key = sorted(played.pending)[0]
+    assert len(played.activate(*key)) == len(viewed.activate(*key))
+    assert played.countUncoveredTiles == viewed.countUncoveredTiles
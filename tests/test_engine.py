@@ -0,0 +1,36 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import pytest
+import engine
+
+def makeEngine():
+    e = engine.Engine(9, 9, 1)
+    e.fill((4, 4), 10)
+    return e
+
+def test_apply_rejects_bad_batch_before_moving():
+    e = makeEngine()
+    calls = []
+    e.addListener(calls.append)
+    flagged = e.flagged.copy()
+    flagsLeft = e.getFlagsLeft()
+    moves = e.getMoveCount()
+
+    for actions in ([("flag", 1, 1), ("bogus", 0, 0)], [("flag", 1, 1), ("reveal", 9, 0)]):
+        with pytest.raises(ValueError):
+            e.apply(actions)
+
+    assert (e.flagged == flagged).all()
+    assert e.getFlagsLeft() == flagsLeft
+    assert e.getMoveCount() == moves
+    assert calls == []
+
+def test_apply_logs_generator_batches():
+    e = makeEngine()
+    actions = [("flag", 0, 0), ("unflag", 0, 0), ("flag", 0, 1)]
+    e.apply(action for action in actions)
+
+    assert e.history.deltas[-1].actions == actions
+    assert e.isFlagged(0, 1) and not e.isFlagged(0, 0)
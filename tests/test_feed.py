@@ -0,0 +1,31 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy
+import engine, feed
+
+def test_spectator_follows_recorded_feed(tmp_path):
+    for format in feed.FORMATS:
+        path = str(tmp_path / ("game." + format))
+        e = engine.Engine(16, 16, 2)
+        f = feed.Feed(path, format)
+        f.attach(e)
+
+        e.fill((8, 8), 40)
+        e.uncover(8, 8)
+        for i in numpy.flatnonzero(e.mines)[:5]:
+            e.flag(*e.getPos(i))
+        e.flag(*e.getPos(numpy.flatnonzero(e.mines)[0]))
+        f.close()
+
+        spectator = feed.Spectator()
+        with open(path, "rb") as inFile:
+            messages = list(feed.read(inFile, format))
+        assert messages[0]["type"] == "keyframe"
+        for message in messages:
+            assert spectator.update(message)
+
+        assert (spectator.looks == e.getLooks(numpy.arange(e.totalTiles))).all()
+        assert spectator.message["flagsLeft"] == e.getFlagsLeft()
+        assert spectator.message["state"] == e.getState()
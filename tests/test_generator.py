@@ -0,0 +1,34 @@
+import os, sys, threading, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import engine, generator
+
+def test_generated_boards_are_solvable():
+    board = generator.generate(9, 9, 10, 1, attempts=200, startPos=(4, 4))
+    assert board is not None
+    assert board.mines.sum() == 10
+    assert generator.isSolvable(board.mines, (4, 4))
+
+def test_request_when_tasks_finish_during_submit():
+    pool = generator.BoardPool(size=2, workers=1)
+    submit = pool.executor.submit
+
+    # Tasks done before add_done_callback run collect at once
+    def slowSubmit(*args):
+        future = submit(*args)
+        future.result()
+        return future
+    pool.executor.submit = slowSubmit
+
+    requester = threading.Thread(target=pool.request, args=(3, 3, 0), daemon=True)
+    requester.start()
+    requester.join(30)
+    assert not requester.is_alive()
+
+    deadline = time.time() + 30
+    while pool.getPooled(3, 3, 0) < 2 and time.time() < deadline:
+        time.sleep(.05)
+    assert pool.getPooled(3, 3, 0) == 2
+    assert pool.pending[(3, 3, 0)] == 0
+    pool.shutdown()
@@ -0,0 +1,47 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy
+import engine, savefile
+
+def checkSaved(e, path):
+    saved = savefile.load(path)
+    for name in ("mines", "revealed", "flagged", "counts"):
+        assert (getattr(saved, name) == getattr(e, name)).all(), name
+
+def test_attach_refill_reload(tmp_path):
+    path = str(tmp_path / "game.sav")
+    # 9x7 tiles leave a partly used last byte in each bitmap
+    e = engine.Engine(9, 7, 5)
+    e.fill((1, 1), 10)
+    savefile.save(e, path, counts=True, regions=True)
+
+    f = savefile.SaveFile(path, writable=True)
+    e = f.toEngine()
+    f.attach(e)
+    e.flag(8, 6)
+    e.uncover(1, 1)
+    checkSaved(e, path)
+
+    e.reset()
+    e.fill((4, 4), 12, seed=9)
+    e.uncover(4, 4)
+    checkSaved(e, path)
+    assert not savefile.SaveFile(path).hasRegions
+
+    e.load(savefile.load(path).mines)
+    checkSaved(e, path)
+    f.close()
+
+def test_regions_match_labeling(tmp_path):
+    path = str(tmp_path / "game.sav")
+    e = engine.Engine(30, 16, 3)
+    e.fill((0, 0), 40)
+    savefile.save(e, path, regions=True)
+
+    loaded = savefile.load(path)
+    labels, offsets, cells = engine.labelOpenings((e.counts == 0) & ~e.mines)
+    assert (loaded.regions == labels).all()
+    assert (loaded.regionOffsets == offsets).all()
+    assert numpy.array_equal(loaded.regionCells, cells)
@@ -0,0 +1,43 @@
+import os, sys, base64, json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy
+import pytest
+import engine, server
+
+def test_handle_round_trip():
+    s = server.Server()
+    gameId = s.handle("NEW 9 9 10 5").split()[1]
+
+    # The same seed and first reveal lay out the same board locally
+    e = engine.Engine(9, 9, 5)
+    e.fill((4, 4), 10)
+    changed = e.uncover(4, 4)
+
+    words = s.handle("REVEAL %s 4 4" % gameId).split()
+    assert words[:3] == ["OK", e.getState(), str(len(changed))]
+    diff = dict(pair.split(":") for pair in words[3:])
+    assert diff == {str(i): str(look) for i, look in zip(changed.tolist(), e.getLooks(changed).tolist())}
+
+    mine = numpy.flatnonzero(e.mines)[0]
+    x, y = e.getPos(mine)
+    e.flag(x, y)
+    assert s.handle("BATCH %s flag %d %d" % (gameId, x, y)).startswith("OK ")
+
+    words = s.handle("STATE %s" % gameId).split()
+    assert words[:5] == ["OK", e.getState(), "9", "9", str(e.getFlagsLeft())]
+    looks = numpy.frombuffer(base64.b64decode(words[5]), dtype=e.getLooks(changed).dtype)
+    assert (looks == e.getLooks(numpy.arange(e.totalTiles))).all()
+
+    assert json.loads(s.handle("STATS")[3:])["moves"] == 2
+    assert s.handle("CLOSE %s" % gameId) == "OK"
+    with pytest.raises(server.ProtocolError):
+        s.handle("STATE %s" % gameId)
+
+def test_handle_rejects_bad_requests():
+    s = server.Server()
+    gameId = s.handle("NEW 9 9 10").split()[1]
+    for line in ("", "NEW 9 9", "REVEAL %s 9 0" % gameId, "BATCH %s dig 0 0" % gameId, "REVEAL %s x 0" % gameId):
+        with pytest.raises(server.ProtocolError):
+            s.handle(line)
@@ -0,0 +1,49 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import engine, solver
+
+def checkSound(e, s):
+    assert not any(e.mines.flat[i] for i in s.getSafe())
+    assert all(e.mines.flat[i] for i in s.getMines())
+
+def test_marks_are_sound_on_seeded_boards():
+    for seed in range(20):
+        e = engine.Engine(16, 16, seed)
+        s = solver.Solver(e)
+        e.fill((8, 8), 40)
+        e.uncover(8, 8)
+
+        while e.isPlayable():
+            checkSound(e, s)
+            if s.getMines():
+                e.flag(*e.getPos(min(s.getMines())))
+            elif s.getSafe():
+                e.uncover(*e.getPos(min(s.getSafe())))
+            else:
+                break
+        assert not e.hasLost()
+
+def test_unflag_matches_fresh_solver():
+    e = engine.Engine(16, 16, 4)
+    s = solver.Solver(e)
+    e.fill((8, 8), 40)
+    e.uncover(8, 8)
+
+    flags = []
+    while s.getMines() and len(flags) < 5:
+        i = min(s.getMines())
+        e.flag(*e.getPos(i))
+        flags.append(i)
+    for i in list(s.getSafe()):
+        e.uncover(*e.getPos(i))
+    assert flags
+
+    for i in flags:
+        e.flag(*e.getPos(i))
+        checkSound(e, s)
+        fresh = solver.Solver(e)
+        assert s.getSafe() == fresh.getSafe()
+        assert s.getMines() == fresh.getMines()
+        fresh.detach()
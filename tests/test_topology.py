@@ -0,0 +1,46 @@
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy
+import engine
+
+def bruteCounts(topology, mask):
+    flat = mask.ravel()
+    counts = [flat[topology.getNeighbors(i)].sum() for i in range(topology.w * topology.h)]
+    return numpy.array(counts).reshape(topology.w, topology.h)
+
+def checkSymmetric(topology):
+    for i in range(topology.w * topology.h):
+        for n in topology.getNeighbors(i):
+            assert i in topology.getNeighbors(n)
+
+def test_torus_neighbors():
+    topology = engine.getTopology("torus", 7, 5)
+    for i in range(7 * 5):
+        neighbors = topology.getNeighbors(i)
+        assert len(set(neighbors.tolist())) == 8 and i not in neighbors
+    checkSymmetric(topology)
+
+    mask = numpy.random.default_rng(1).random((7, 5)) < .3
+    assert (topology.countNeighbors(mask) == bruteCounts(topology, mask)).all()
+
+def test_hex_neighbors():
+    topology = engine.getTopology("hex", 8, 6)
+    for x in range(8):
+        for y in range(6):
+            neighbors = topology.getNeighbors(x * 6 + y)
+            assert len(set(neighbors.tolist())) == len(neighbors) and x * 6 + y not in neighbors
+            if 0 < x < 7 and 0 < y < 5:
+                assert len(neighbors) == 6
+    assert len(topology.getNeighbors(0)) == 2
+    checkSymmetric(topology)
+
+    mask = numpy.random.default_rng(2).random((8, 6)) < .3
+    assert (topology.countNeighbors(mask) == bruteCounts(topology, mask)).all()
+
+def test_engine_counts_follow_topology():
+    for name in ("torus", "hex"):
+        e = engine.Engine(10, 8, 4, topology=name)
+        e.fill((5, 4), 15)
+        assert (e.counts == bruteCounts(e.topology, e.mines)).all()